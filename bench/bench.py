@@ -0,0 +1,285 @@
+"""
+Benchmark for TextBox operations on the host simulation backend.
+
+Runs the TextBox operations and a few realistic scenarios against the
+SSD1306 (I2C and SPI) and ST7735R drivers with recording fake buses
+(see /sim) and reports for each operation:
+
+    calls           number of calls measured
+    bytes           bytes sent on the bus
+    transactions    bus transactions (I2C writes / SPI write calls)
+    pixels_drawn    pixels written by FrameBuffer drawing primitives
+    pixels_blitted  pixels copied by FrameBuffer.blit
+    alloc_peak      peak of newly allocated Python memory (tracemalloc)
+    time_us         host wall time, measured in a separate run
+                    without tracemalloc
+
+Bus and pixel counts are exact and deterministic, so they can be
+compared between versions. Wall time is host time and only useful to
+compare runs on the same machine.
+
+Usage (from the repository root):
+
+    python bench/bench.py                   print a table
+    python bench/bench.py --json out.json   also write the results
+    python bench/bench.py --compare old.json
+                                            show the change against
+                                            an earlier --json file
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sim
+sim.install()
+
+import framebuf
+from machine import I2C, SPI, Pin
+import ssd1306
+from ST7735R import ST7735R
+from TextBox import TextBox, TextBoxOLED, TextBoxTFT
+
+COUNTERS = ('bytes', 'transactions', 'pixels_drawn', 'pixels_blitted', 'alloc_peak')
+
+
+# Displays
+
+def oled_i2c():
+    bus = I2C(0)
+    return ssd1306.SSD1306_I2C(128, 64, bus), bus, TextBoxOLED
+
+
+# Lines aligned to the 8 pixel pages
+def oled_i2c_page():
+    bus = I2C(0)
+    box_class = lambda display, **kw: TextBoxOLED(display, page_aligned = True, **kw)
+    return ssd1306.SSD1306_I2C(128, 64, bus), bus, box_class
+
+
+def oled_spi():
+    bus = SPI(0)
+    display = ssd1306.SSD1306_SPI(128, 64, bus, Pin(1), Pin(2), Pin(3))
+    return display, bus, TextBoxOLED
+
+
+def tft():
+    bus = SPI(0)
+    display = ST7735R(bus, Pin(1), Pin(2), Pin(3), height = 160, width = 128)
+    return display, bus, TextBoxTFT
+
+
+def tft_rgb565():
+    bus = SPI(0)
+    display = ST7735R(bus, Pin(1), Pin(2), Pin(3), height = 160, width = 128, rgb565 = True)
+    return display, bus, TextBoxTFT
+
+
+DRIVERS = (('SSD1306_I2C', oled_i2c), ('SSD1306_I2C_page', oled_i2c_page),
+           ('SSD1306_SPI', oled_spi), ('ST7735R', tft),
+           ('ST7735R_565', tft_rgb565))
+
+
+# Measurement
+
+class Meter:
+    # Collects the counters of all measured calls per operation name
+    def __init__(self, bus, trace):
+        self.bus = bus
+        self.trace = trace
+        self.results = {}
+
+    def measure(self, op, func, *args):
+        bus = self.bus
+        bus.reset()
+        framebuf.reset_stats()
+        if self.trace:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter_ns()
+        result = func(*args)
+        elapsed = time.perf_counter_ns() - t0
+        r = self.results.setdefault(op, dict.fromkeys(('calls', 'time_us') + COUNTERS, 0))
+        r['calls'] += 1
+        r['time_us'] += elapsed / 1000
+        if self.trace:
+            r['alloc_peak'] = max(r['alloc_peak'], tracemalloc.get_traced_memory()[1] - base)
+        r['bytes'] += bus.bytes
+        r['transactions'] += bus.transactions
+        r['pixels_drawn'] += framebuf.stats['drawn']
+        r['pixels_blitted'] += framebuf.stats['blitted']
+        return result
+
+
+# Scenarios
+# Each scenario gets a fresh display and calls m.measure() for the
+# operations it wants to report.
+
+def scenario_ops(m, display, box_class):
+    box = box_class(display, caption = 'Box 1', pos = 0)
+    lines = [m.measure('add_line', box.add_line, 'Line ' + str(i + 1)) for i in range(4)]
+    m.measure('show', box.show)
+    m.measure('update_line', box.update_line, lines[1], '12345')
+    m.measure('update_line_digit', box.update_line, lines[1], '12346')
+    m.measure('update_line_same', box.update_line, lines[1], '12346')
+    m.measure('update_caption', box.update_caption, 'Caption')
+    m.measure('invert_color', box.invert_color, lines[2])
+    m.measure('delete_line', box.delete_line, lines[0])
+    m.measure('set_pos', box.set_pos, 2)
+
+
+# Sequence of src/TextBox_OLED.py
+def scenario_demo_oled(m, display, box_class):
+    box_1 = box_class(display, caption = 'Box 1', pos = 0)
+    line_1 = m.measure('add_line', box_1.add_line, 'A')
+    m.measure('show', box_1.show)
+    m.measure('update_line', box_1.update_line, line_1, 'Box Height: ' + str(box_1.box_h))
+    m.measure('update_caption', box_1.update_caption, 'Update')
+    box_2 = box_class(display, caption = 'Box 2', pos = box_1.box_h + 2)
+    m.measure('add_line', box_2.add_line, 'A')
+    b2_line_2 = m.measure('add_line', box_2.add_line, 'B')
+    m.measure('show', box_2.show)
+    m.measure('update_line', box_2.update_line, b2_line_2, 'Box Height: ' + str(box_2.box_h))
+
+
+# Sequence of src/TextBox_TFT.py
+def scenario_demo_tft(m, display, box_class):
+    rnd = random.Random(1)
+    box_1 = box_class(display, caption = 'Ambient Data', pos = 5,
+                      fg_color = (0, 255, 0), bg_color = ((0,) * 3))
+    lines = [m.measure('add_line', box_1.add_line, 'Line ' + str(i + 1)) for i in range(5)]
+    m.measure('show', box_1.show)
+    for line in lines:
+        m.measure('invert_color', box_1.invert_color, line)
+        m.measure('invert_color', box_1.invert_color, line)
+    for line in lines:
+        m.measure('update_line', box_1.update_line, line, str(rnd.randint(1000, 99999)))
+    for line in reversed(lines):
+        m.measure('delete_line', box_1.delete_line, line)
+    new_lines = []
+    for i in range(5):
+        new_lines.append(m.measure('add_line', box_1.add_line, 'New line: ' + str(i + 1)))
+        m.measure('show', box_1.show)
+    box_2 = box_class(display, caption = 'Box 2', pos = box_1.box_y + box_1.box_h + 5,
+                      fg_color = (255, 255, 255), bg_color = (0, 0, 255))
+    for i in range(5):
+        m.measure('add_line', box_2.add_line, 'Box 2, Line ' + str(i + 1))
+    m.measure('show', box_2.show)
+    m.measure('delete_line', box_1.delete_line, new_lines[-1])
+    m.measure('set_pos', box_2.set_pos, box_1.box_y + box_1.box_h + 5)
+    m.measure('add_line', box_1.add_line, 'Another line')
+    m.measure('show', box_1.show)
+    m.measure('set_pos', box_2.set_pos, box_1.box_y + box_1.box_h + 5)
+    m.measure('show', box_1.show)
+
+
+def scenario_demo(m, display, box_class):
+    if box_class is TextBoxTFT:
+        scenario_demo_tft(m, display, box_class)
+    else:
+        scenario_demo_oled(m, display, box_class)
+
+
+# Four sensor values polled at 10 Hz for 10 seconds, one
+# update_lines() call per frame. Temperature and humidity change
+# slowly, so many updates repeat the previous value or change a
+# single digit.
+def scenario_dashboard(m, display, box_class):
+    rnd = random.Random(2)
+    box = box_class(display, caption = 'Sensors', pos = 0)
+    names = ('Temp', 'Hum', 'Press', 'Count')
+    lines = [box.add_line(name + ': -') for name in names]
+    box.show()
+    temp = 23.4
+    hum = 45
+    press = 1013.2
+    count = 0
+    for frame in range(100):
+        temp += rnd.choice((-0.1, 0, 0, 0, 0.1))
+        hum += rnd.choice((-1, 0, 0, 0, 0, 0, 1))
+        press += rnd.choice((-0.1, 0, 0.1))
+        count += 1
+        values = ('{:.1f} C'.format(temp), '{} %'.format(hum),
+                  '{:.1f} hPa'.format(press), str(count))
+        m.measure('frame', box.update_lines,
+                  {line: name + ': ' + value for name, line, value in zip(names, lines, values)})
+
+
+SCENARIOS = (('ops', scenario_ops), ('demo', scenario_demo), ('dashboard', scenario_dashboard))
+
+
+def run_scenario(scenario, make_display, trace):
+    # Start every run with an empty glyph cache
+    if TextBox.glyphs is not None:
+        TextBox.glyphs.clear()
+    display, bus, box_class = make_display()
+    m = Meter(bus, trace)
+    if trace:
+        tracemalloc.start()
+    try:
+        scenario(m, display, box_class)
+    finally:
+        if trace:
+            tracemalloc.stop()
+    return m.results
+
+
+def run(scenarios = SCENARIOS, drivers = DRIVERS):
+    results = []
+    for scenario_name, scenario in scenarios:
+        for driver_name, make_display in drivers:
+            counted = run_scenario(scenario, make_display, True)
+            timed = run_scenario(scenario, make_display, False)
+            for op, r in counted.items():
+                r['time_us'] = round(timed[op]['time_us'], 1)
+                r.update(scenario = scenario_name, driver = driver_name, op = op)
+                results.append(r)
+    return results
+
+
+def key(r):
+    return (r['scenario'], r['driver'], r['op'])
+
+
+def print_table(results, baseline = None):
+    base = {key(r): r for r in baseline} if baseline else {}
+    cols = ('calls', 'bytes', 'transactions', 'pixels_drawn', 'pixels_blitted',
+            'alloc_peak', 'time_us')
+    print('{:10} {:16} {:18}'.format('scenario', 'driver', 'op')
+          + ''.join('{:>15}'.format(c) for c in cols))
+    for r in results:
+        old = base.get(key(r))
+        cells = []
+        for c in cols:
+            cell = str(round(r[c]))
+            if old is not None and old.get(c) and c != 'calls':
+                cell += ' ({:+.0%})'.format(r[c] / old[c] - 1)
+            cells.append('{:>15}'.format(cell))
+        print('{:10} {:16} {:18}'.format(r['scenario'], r['driver'], r['op']) + ''.join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'TextBox benchmark on the host simulation')
+    parser.add_argument('--json', help = 'write results to this file')
+    parser.add_argument('--compare', help = 'results of an earlier --json run')
+    parser.add_argument('--quiet', action = 'store_true', help = 'do not print the table')
+    args = parser.parse_args()
+
+    results = run()
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'results': results}, f, indent = 1)
+    if not args.quiet:
+        baseline = None
+        if args.compare:
+            with open(args.compare) as f:
+                baseline = json.load(f)['results']
+        print_table(results, baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Host simulation backend for TextBox.
+
+Runs the unmodified modules from src/lib (TextBox, ssd1306, ST7735R)
+under CPython by putting pure-Python stand-ins for framebuf, micropython
+and machine on the import path:
+
+    import sim
+    sim.install()
+
+    from machine import I2C
+    import ssd1306
+    from TextBox import TextBoxOLED
+
+    i2c = I2C(0)
+    display = ssd1306.SSD1306_I2C(128, 64, i2c)
+    box = TextBoxOLED(display, caption = 'Box 1')
+    box.add_line('A')
+    box.show()
+    print(i2c.bytes, i2c.transactions)
+
+install() also adds the MicroPython extensions of the time module
+(sleep_ms, ticks_ms, ...) that the drivers import. sleep_ms and sleep_us
+return immediately unless install(realtime = True) is used, so the
+500 ms display initialization does not slow down CI runs.
+"""
+import os
+import sys
+import time
+
+SIM_DIR = os.path.dirname(os.path.abspath(__file__))
+LIB_DIR = os.path.join(os.path.dirname(SIM_DIR), 'src', 'lib')
+
+_installed = False
+
+
+def install(realtime = False, lib = True):
+    global _installed
+    if not _installed:
+        sys.path.insert(0, SIM_DIR)
+        if lib:
+            sys.path.insert(1, LIB_DIR)
+        import micropython # Installs const() and viper types as builtins
+        _install_time(realtime)
+        _installed = True
+
+
+def _install_time(realtime):
+    if realtime:
+        time.sleep_ms = lambda ms: time.sleep(ms / 1000)
+        time.sleep_us = lambda us: time.sleep(us / 1000000)
+    else:
+        time.sleep_ms = lambda ms: None
+        time.sleep_us = lambda us: None
+    time.ticks_ms = lambda: time.perf_counter_ns() // 1000000 & 0x3FFFFFFF
+    time.ticks_us = lambda: time.perf_counter_ns() // 1000 & 0x3FFFFFFF
+    time.ticks_cpu = lambda: time.perf_counter_ns() & 0x3FFFFFFF
+    time.ticks_add = lambda t, d: (t + d) & 0x3FFFFFFF
+    time.ticks_diff = _ticks_diff
+
+
+def _ticks_diff(t1, t0):
+    d = (t1 - t0) & 0x3FFFFFFF
+    return d - 0x40000000 if d & 0x20000000 else d
@@ -0,0 +1,252 @@
+# Pure-Python stand-in for the MicroPython framebuf module.
+#
+# Implements the subset used by TextBox and the bundled drivers:
+# MONO_VLSB, MONO_HLSB, GS8 and RGB565 buffers, the drawing primitives,
+# text(), scroll() and blit() with key and palette.
+#
+# Pixel semantics follow modframebuf.c: colors are truncated to the
+# buffer format on write, RGB565 is stored little-endian, out-of-range
+# coordinates are clipped and text() only draws foreground pixels.
+#
+# The glyphs of text() are NOT the MicroPython petme128 font. They are
+# derived from the character code so that every printable character
+# except space sets a distinct, deterministic pattern of pixels inside
+# its 8 * 8 cell. This is sufficient for measuring render cost and for
+# comparing frames, not for looking at them.
+
+MONO_VLSB = 0
+RGB565 = 1
+GS4_HMSB = 2
+MONO_HLSB = 3
+MONO_HMSB = 4
+GS2_HMSB = 5
+GS8 = 6
+
+# Work counters, read and reset by the benchmark harness.
+# drawn: pixels written by fill / fill_rect / text / primitives
+# blitted: destination pixels visited by blit()
+stats = {'drawn': 0, 'blitted': 0}
+
+
+def reset_stats():
+    stats['drawn'] = 0
+    stats['blitted'] = 0
+
+
+def _glyph(code):
+    # Eight column bytes (bit 0 = top row) like the petme128 font.
+    if code == 32:
+        return (0,) * 8
+    h = (code * 2654435761) & 0xFFFFFFFF
+    cols = [0]
+    for i in range(6):
+        h = (h * 1103515245 + 12345) & 0xFFFFFFFF
+        cols.append(((h >> 16) & 0x7E) | 0x01)
+    cols.append(0)
+    return tuple(cols)
+
+
+_FONT = [_glyph(c) for c in range(32, 128)]
+
+
+class FrameBuffer:
+    def __init__(self, buf, width, height, format, stride=None):
+        self.buf = memoryview(buf).cast('B') if not isinstance(buf, bytearray) else buf
+        self.width = width
+        self.height = height
+        self.format = format
+        self.stride = width if stride is None else stride
+        if format == MONO_VLSB:
+            need = self.stride * ((height + 7) // 8)
+        elif format in (MONO_HLSB, MONO_HMSB):
+            need = ((self.stride + 7) // 8) * height
+        elif format == GS8:
+            need = self.stride * height
+        elif format == RGB565:
+            need = self.stride * height * 2
+        else:
+            raise ValueError('invalid format')
+        if len(self.buf) < need:
+            raise ValueError('buffer too small')
+
+    # Pixel access
+
+    def _get(self, x, y):
+        f = self.format
+        b = self.buf
+        if f == GS8:
+            return b[y * self.stride + x]
+        if f == RGB565:
+            i = (y * self.stride + x) * 2
+            return b[i] | (b[i + 1] << 8)
+        if f == MONO_VLSB:
+            return (b[(y >> 3) * self.stride + x] >> (y & 7)) & 1
+        if f == MONO_HLSB:
+            return (b[(y * ((self.stride + 7) // 8)) + (x >> 3)] >> (7 - (x & 7))) & 1
+        return (b[(y * ((self.stride + 7) // 8)) + (x >> 3)] >> (x & 7)) & 1
+
+    def _set(self, x, y, c):
+        f = self.format
+        b = self.buf
+        if f == GS8:
+            b[y * self.stride + x] = c & 0xFF
+        elif f == RGB565:
+            i = (y * self.stride + x) * 2
+            b[i] = c & 0xFF
+            b[i + 1] = (c >> 8) & 0xFF
+        elif f == MONO_VLSB:
+            i = (y >> 3) * self.stride + x
+            m = 1 << (y & 7)
+            b[i] = (b[i] | m) if c else (b[i] & ~m)
+        else:
+            i = (y * ((self.stride + 7) // 8)) + (x >> 3)
+            m = (0x80 >> (x & 7)) if f == MONO_HLSB else (1 << (x & 7))
+            b[i] = (b[i] | m) if c else (b[i] & ~m)
+
+    def pixel(self, x, y, c=None):
+        if 0 <= x < self.width and 0 <= y < self.height:
+            if c is None:
+                return self._get(x, y)
+            self._set(x, y, c)
+            stats['drawn'] += 1
+        return None
+
+    # Filled shapes
+
+    def fill_rect(self, x, y, w, h, c):
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + w, self.width)
+        y1 = min(y + h, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        stats['drawn'] += (x1 - x0) * (y1 - y0)
+        f = self.format
+        b = self.buf
+        if f == GS8:
+            row = bytes((c & 0xFF,)) * (x1 - x0)
+            for yy in range(y0, y1):
+                i = yy * self.stride
+                b[i + x0:i + x1] = row
+        elif f == RGB565:
+            row = bytes((c & 0xFF, (c >> 8) & 0xFF)) * (x1 - x0)
+            for yy in range(y0, y1):
+                i = yy * self.stride * 2
+                b[i + 2 * x0:i + 2 * x1] = row
+        else:
+            s = self._set
+            for yy in range(y0, y1):
+                for xx in range(x0, x1):
+                    s(xx, yy, c)
+
+    def fill(self, c):
+        self.fill_rect(0, 0, self.width, self.height, c)
+
+    def hline(self, x, y, w, c):
+        self.fill_rect(x, y, w, 1, c)
+
+    def vline(self, x, y, h, c):
+        self.fill_rect(x, y, 1, h, c)
+
+    def rect(self, x, y, w, h, c, f=False):
+        if f:
+            self.fill_rect(x, y, w, h, c)
+        else:
+            self.fill_rect(x, y, w, 1, c)
+            self.fill_rect(x, y + h - 1, w, 1, c)
+            self.fill_rect(x, y, 1, h, c)
+            self.fill_rect(x + w - 1, y, 1, h, c)
+
+    def line(self, x1, y1, x2, y2, c):
+        dx = abs(x2 - x1)
+        dy = -abs(y2 - y1)
+        sx = 1 if x1 < x2 else -1
+        sy = 1 if y1 < y2 else -1
+        err = dx + dy
+        while True:
+            self.pixel(x1, y1, c)
+            if x1 == x2 and y1 == y2:
+                break
+            e2 = 2 * err
+            if e2 >= dy:
+                err += dy
+                x1 += sx
+            if e2 <= dx:
+                err += dx
+                y1 += sy
+
+    # Text with the stand-in 8 * 8 font, foreground pixels only
+
+    def text(self, s, x0, y0, c=1):
+        for ch in s:
+            code = ord(ch)
+            if code < 32 or code > 127:
+                code = 127
+            cols = _FONT[code - 32]
+            for j in range(8):
+                xx = x0 + j
+                if 0 <= xx < self.width:
+                    bits = cols[j]
+                    yy = y0
+                    while bits:
+                        if bits & 1 and 0 <= yy < self.height:
+                            self._set(xx, yy, c)
+                            stats['drawn'] += 1
+                        bits >>= 1
+                        yy += 1
+            x0 += 8
+
+    # Move the contents, the uncovered area keeps its old pixels
+
+    def scroll(self, xstep, ystep):
+        w = self.width
+        h = self.height
+        if xstep < 0:
+            sx, xend, dx = 0, w + xstep, 1
+        else:
+            sx, xend, dx = w - 1, xstep - 1, -1
+        if ystep < 0:
+            y, yend, dy = 0, h + ystep, 1
+        else:
+            y, yend, dy = h - 1, ystep - 1, -1
+        g = self._get
+        s = self._set
+        while y != yend:
+            x = sx
+            while x != xend:
+                s(x, y, g(x - xstep, y - ystep))
+                x += dx
+            y += dy
+
+    def blit(self, fbuf, x, y, key=-1, palette=None):
+        if isinstance(fbuf, tuple):
+            fbuf = FrameBuffer(*fbuf)
+        x0 = max(x, 0)
+        y0 = max(y, 0)
+        x1 = min(x + fbuf.width, self.width)
+        y1 = min(y + fbuf.height, self.height)
+        if x1 <= x0 or y1 <= y0:
+            return
+        stats['blitted'] += (x1 - x0) * (y1 - y0)
+        f = self.format
+        if (key == -1 and palette is None and fbuf.format == f
+                and f in (GS8, RGB565) and fbuf is not self):
+            bpp = 1 if f == GS8 else 2
+            sb = fbuf.buf
+            db = self.buf
+            n = (x1 - x0) * bpp
+            for yy in range(y0, y1):
+                si = ((yy - y) * fbuf.stride + (x0 - x)) * bpp
+                di = (yy * self.stride + x0) * bpp
+                db[di:di + n] = sb[si:si + n]
+            return
+        g = fbuf._get
+        s = self._set
+        pg = palette._get if palette is not None else None
+        for yy in range(y0, y1):
+            for xx in range(x0, x1):
+                col = g(xx - x, yy - y)
+                if pg is not None:
+                    col = pg(col, 0)
+                if col != key:
+                    s(xx, yy, col)
@@ -0,0 +1,141 @@
+# Pure-Python stand-in for the parts of the MicroPython machine module
+# used by the drivers and examples: Pin, I2C and SPI.
+#
+# The buses do not talk to hardware. Every transaction is recorded:
+#
+#     bus.transactions    number of bus transactions (one per START on I2C,
+#                         one per write() call on SPI)
+#     bus.bytes           payload bytes sent, including I2C control bytes
+#     bus.log             list of (op, nbytes) tuples, only if bus.logging
+#     bus.listeners       callables invoked as listener(bus, op, data)
+#
+# A listener receives the data itself, so a test can decode the traffic,
+# e.g. to rebuild the panel contents from the command stream.
+
+
+class Pin:
+    IN = 0
+    OUT = 1
+    OPEN_DRAIN = 2
+    PULL_UP = 1
+    PULL_DOWN = 2
+    IRQ_FALLING = 4
+    IRQ_RISING = 8
+
+    def __init__(self, id, mode=-1, pull=-1, value=None):
+        self.id = id
+        self.mode = mode
+        self.pull = pull
+        self._value = 0 if value is None else int(bool(value))
+        self.changes = 0
+
+    def init(self, mode=-1, pull=-1, value=None):
+        if mode != -1:
+            self.mode = mode
+        if pull != -1:
+            self.pull = pull
+        if value is not None:
+            self(value)
+
+    def __call__(self, value=None):
+        if value is None:
+            return self._value
+        self._value = int(bool(value))
+        self.changes += 1
+        return None
+
+    def value(self, value=None):
+        return self(value)
+
+    def on(self):
+        self(1)
+
+    def off(self):
+        self(0)
+
+    def __repr__(self):
+        return 'Pin({})'.format(self.id)
+
+
+class _Bus:
+    def __init__(self):
+        self.logging = False
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        self.transactions = 0
+        self.bytes = 0
+        self.log = []
+
+    def _record(self, op, data):
+        n = len(data)
+        self.transactions += 1
+        self.bytes += n
+        if self.logging:
+            self.log.append((op, n))
+        for listener in self.listeners:
+            listener(self, op, data)
+
+
+class I2C(_Bus):
+    def __init__(self, id=0, scl=None, sda=None, freq=400000, timeout=50000):
+        self.id = id
+        self.scl = scl
+        self.sda = sda
+        self.freq = freq
+        super().__init__()
+
+    def init(self, scl=None, sda=None, freq=400000, timeout=50000):
+        self.freq = freq
+
+    def scan(self):
+        return [0x3C]
+
+    def writeto(self, addr, buf, stop=True):
+        self._record('writeto', bytes(buf))
+        return len(buf)
+
+    def writevto(self, addr, vector, stop=True):
+        data = b''.join(bytes(b) for b in vector)
+        self._record('writevto', data)
+        return len(data)
+
+    def readfrom(self, addr, nbytes, stop=True):
+        return bytes(nbytes)
+
+    def readfrom_into(self, addr, buf, stop=True):
+        pass
+
+
+class SPI(_Bus):
+    MSB = 0
+    LSB = 1
+
+    def __init__(self, id=0, baudrate=1000000, polarity=0, phase=0, bits=8,
+                 firstbit=0, sck=None, mosi=None, miso=None):
+        self.id = id
+        self.baudrate = baudrate
+        self.polarity = polarity
+        self.phase = phase
+        self.inits = 0
+        super().__init__()
+
+    def init(self, baudrate=1000000, polarity=0, phase=0, bits=8, firstbit=0,
+             sck=None, mosi=None, miso=None):
+        self.baudrate = baudrate
+        self.polarity = polarity
+        self.phase = phase
+        self.inits += 1
+
+    def write(self, buf):
+        self._record('write', bytes(buf))
+
+    def read(self, nbytes, write=0x00):
+        return bytes(nbytes)
+
+    def readinto(self, buf, write=0x00):
+        pass
+
+    def write_readinto(self, write_buf, read_buf):
+        self._record('write', bytes(write_buf))
@@ -0,0 +1,55 @@
+# Pure-Python stand-in for the MicroPython micropython module.
+#
+# The code emitters are no-ops: decorated functions run as ordinary
+# Python. Importing this module also installs the viper pointer types
+# (ptr8, ptr16, ptr32, uint) and const() as builtins, because viper
+# annotations and const() are evaluated like any other name under CPython.
+
+import builtins
+
+
+def const(expr):
+    return expr
+
+
+def viper(func):
+    return func
+
+
+def native(func):
+    return func
+
+
+def alloc_emergency_exception_buf(size):
+    pass
+
+
+def opt_level(level=None):
+    return 0
+
+
+def schedule(func, arg):
+    func(arg)
+
+
+class _Ptr:
+    # Only used as an annotation
+    pass
+
+
+class ptr8(_Ptr):
+    pass
+
+
+class ptr16(_Ptr):
+    pass
+
+
+class ptr32(_Ptr):
+    pass
+
+
+for _name, _obj in (('const', const), ('ptr8', ptr8), ('ptr16', ptr16),
+                    ('ptr32', ptr32), ('uint', int)):
+    if not hasattr(builtins, _name):
+        setattr(builtins, _name, _obj)
@@ -36,6 +36,7 @@ from time import sleep_ms
 import framebuf
 import gc
 import micropython
+from array import array
 
 
 class BoolPalette(framebuf.FrameBuffer):
@@ -72,6 +73,15 @@ def _lcopy(dest:ptr8, source:ptr8, length:int):
         dest[n] = ((d & 0x1c) << 3) | ((d & 3) << 2)  # G1 B1
         n += 1
 
+# _rowhash: 30 bit djb2 hash of length bytes, used to find changed rows.
+# Rows with equal hashes are taken as unchanged.
+@micropython.viper
+def _rowhash(source:ptr8, length:int) -> int:
+    h = 5381
+    for x in range(length):
+        h = (((h << 5) + h) ^ source[x]) & 0x3fffffff
+    return h
+
 class ST7735R(framebuf.FrameBuffer):
     # Convert r, g, b in range 0-255 to an 8 bit colour value
     # rrrgggbb. Converted to 12 bit on the fly.
@@ -79,8 +89,27 @@ class ST7735R(framebuf.FrameBuffer):
     def rgb(r, g, b):
         return (r & 0xe0) | ((g >> 3) & 0x1c) | (b >> 6)
 
+    # Convert r, g, b in range 0-255 to a 16 bit RGB565 colour value.
+    # The bytes are swapped: the FrameBuffer stores pixels little endian,
+    # the display expects the high byte first.
+    @staticmethod
+    def rgb565(r, g, b):
+        c = ((r & 0xf8) << 8) | ((g & 0xfc) << 3) | (b >> 3)
+        return ((c & 0xff) << 8) | (c >> 8)
+
     # rst and cs are active low, SPI is mode 0
-    def __init__(self, spi, cs, dc, rst, height=160, width=128, usd=False, init_spi=False):
+    # rgb565=False: 8 bit FrameBuffer (20KB), converted to 12 bit per row
+    # rgb565=True: 16 bit FrameBuffer (40KB), sent without conversion
+    # block_rows: rows converted into a block and sent with one SPI write
+    # writer: optional non-blocking writer for the SPI bus of the display
+    # (e.g. using DMA), an object with write(buf), which starts sending buf
+    # and returns, and wait(), which blocks until the transfer is done.
+    # With a writer two blocks are used: the next block is converted while
+    # the previous one is sent. Without, spi.write() is used.
+    # shadow=True: keep a hash of each row as last sent (4 bytes per row).
+    # Full width refreshes (show()) only send the rows that changed.
+    def __init__(self, spi, cs, dc, rst, height=160, width=128, usd=False, init_spi=False,
+                 rgb565=False, block_rows=8, writer=None, shadow=False):
         self._spi = spi
         self._rst = rst  # Pins
         self._dc = dc
@@ -88,13 +117,31 @@ class ST7735R(framebuf.FrameBuffer):
         self.height = height  # Required by Writer class
         self.width = width
         self._spi_init = init_spi
-        mode = framebuf.GS8  # Use 8bit greyscale for 8 bit color.
+        if rgb565:
+            mode = framebuf.RGB565
+            self.rgb = self.rgb565
+        else:
+            mode = framebuf.GS8  # Use 8bit greyscale for 8 bit color.
+        self.mode = mode  # Native format, used by TextBox for its buffers
         self.palette = BoolPalette(mode)
         gc.collect()
-        buf = bytearray(height * width)
+        buf = bytearray(height * width * (2 if rgb565 else 1))
         self._mvb = memoryview(buf)
         super().__init__(buf, width, height, mode)
-        self._linebuf = bytearray(int(width * 3 // 2))  # 12 bit color out
+        self._block_rows = block_rows
+        self._writer = writer
+        # Rows in display order, 12 bit color out in 8 bit mode
+        rowbytes = width * 2 if rgb565 else int(width * 3 // 2)
+        self._blocks = [memoryview(bytearray(rowbytes * block_rows))
+                        for _ in range(1 if writer is None else 2)]
+        self._winbuf = bytearray(4)  # CASET / RASET argument
+        self._scrbuf = bytearray(6)  # VSCRDEF argument
+        self._scroll_area = None
+        if shadow:
+            self._hashes = array('I', (0 for _ in range(height)))
+            self._sent = bytearray(height)  # 1: row hash matches the display
+        else:
+            self._hashes = None
         self._init(usd)
         self.show()
 
@@ -155,7 +202,10 @@ class ST7735R(framebuf.FrameBuffer):
             wcd(b'\x36', b'\x80' if usd else b'\x40')  # MADCTL: RGB portrait mode
         else:
             wcd(b'\x36', b'\xe0' if usd else b'\x20')  # MADCTL: RGB landscape mode
-        wcd(b'\x3a', b'\x03')  # COLMOD 12 bit
+        if self.mode == framebuf.RGB565:
+            wcd(b'\x3a', b'\x05')  # COLMOD 16 bit
+        else:
+            wcd(b'\x3a', b'\x03')  # COLMOD 12 bit
         wcd(b'\xe0', b'\x02\x1c\x07\x12\x37\x32\x29\x2d\x29\x25\x2B\x39\x00\x01\x03\x10')  # GMCTRP1 Gamma
         wcd(b'\xe1', b'\x03\x1d\x07\x06\x2E\x2C\x29\x2D\x2E\x2E\x37\x3F\x00\x00\x02\x10')  # GMCTRN1
 
@@ -167,18 +217,141 @@ class ST7735R(framebuf.FrameBuffer):
         cmd(b'\x29')  # DISPON
         sleep_ms(100)
 
+    # Set the address window to columns x0..x1 and memory rows y0..y1 (inclusive).
+    def _setwin(self, x0, y0, x1, y1):
+        wb = self._winbuf
+        wb[0] = x0 >> 8
+        wb[1] = x0 & 0xff
+        wb[2] = x1 >> 8
+        wb[3] = x1 & 0xff
+        self._wcd(b'\x2a', wb)  # CASET
+        wb[0] = y0 >> 8
+        wb[1] = y0 & 0xff
+        wb[2] = y1 >> 8
+        wb[3] = y1 & 0xff
+        self._wcd(b'\x2b', wb)  # RASET
+
     def show(self):  # Blocks 36ms on Pyboard D at stock frequency (160*128)
+        self.show_rect(0, 0, self.width, self.height)
+
+    # Send only the pixels in the rectangle x, y, w, h to the display.
+    # The rectangle is clipped to the display and widened to an even
+    # number of columns because _lcopy converts pixel pairs.
+    # With shadow=True rows of a full width rectangle are only sent if
+    # their hash changed. Rows sent in part get no valid hash.
+    def show_rect(self, x, y, w, h):
         wd = self.width
         ht = self.height
-        lb = self._linebuf
+        x1 = min(x + w, wd)
+        y1 = min(y + h, ht)
+        x = max(x, 0) & ~1
+        y = max(y, 0)
+        x1 = min(x1 + (x1 & 1), wd)
+        if x1 <= x or y1 <= y:
+            return
+        hashes = self._hashes
+        if hashes is None:
+            self._send_rect(x, y, x1, y1)
+            return
+        sent = self._sent
+        if x > 0 or x1 < wd:
+            self._send_rect(x, y, x1, y1)
+            for row in range(y, y1):
+                sent[row] = 0
+            return
+        # Send runs of changed rows
+        buf = self._mvb
+        nb = wd * 2 if self.mode == framebuf.RGB565 else wd
+        start = -1
+        for row in range(y, y1):
+            hash = _rowhash(buf[row * nb :], nb)
+            if sent[row] and hashes[row] == hash:
+                if start >= 0:
+                    self._send_rect(0, start, wd, row)
+                    start = -1
+            else:
+                hashes[row] = hash
+                sent[row] = 1
+                if start < 0:
+                    start = row
+        if start >= 0:
+            self._send_rect(0, start, wd, y1)
+
+    # Send the columns x .. x1 - 1 of the rows y .. y1 - 1.
+    # Rows are stored bottom-up in display memory (see show()), so the
+    # window is mirrored vertically and rows are sent from y1 - 1 to y.
+    def _send_rect(self, x, y, x1, y1):
+        wd = self.width
+        ht = self.height
+        n = x1 - x
         buf = self._mvb
-        self._dc(0)
-        self._cs(0)
         if self._spi_init:  # A callback was passed
             self._spi_init(self._spi)  # Bus may be shared
+        self._setwin(x, ht - y1, x1 - 1, ht - 1 - y)
+        self._dc(0)
+        self._cs(0)
         self._spi.write(b'\x2c')  # RAMWR
         self._dc(1)
-        for start in range(wd * (ht - 1), -1, - wd):  # For each line
-            _lcopy(lb, buf[start :], wd)  # Copy and map colors (68us)
-            self._spi.write(lb)
-        self._cs(1)
\ No newline at end of file
+        rgb565 = self.mode == framebuf.RGB565
+        nb = n * 2 if rgb565 else n * 3 // 2  # Bytes per row sent
+        full = nb * self._block_rows
+        blocks = self._blocks
+        b = 0
+        lb = blocks[0]
+        k = 0
+        busy = False
+        for start in range(wd * (y1 - 1) + x, wd * y + x - 1, - wd):  # For each line
+            if rgb565:
+                lb[k : k + nb] = buf[2 * start : 2 * start + nb]  # No conversion
+            else:
+                _lcopy(lb[k :], buf[start :], n)  # Copy and map colors (68us for a full line)
+            k += nb
+            if k == full:
+                busy = self._write(lb[:k], busy)
+                b = (b + 1) % len(blocks)  # Convert the next block while this one is sent
+                lb = blocks[b]
+                k = 0
+        if k:
+            busy = self._write(lb[:k], busy)
+        if busy:
+            self._writer.wait()
+        self._cs(1)
+
+    # Send a block. Returns True while a non-blocking transfer is running
+    def _write(self, data, busy):
+        writer = self._writer
+        if writer is None:
+            self._spi.write(data)
+            return False
+        if busy:
+            writer.wait()
+        writer.write(data)
+        return True
+
+    # Hardware vertical scrolling of the rows y .. y + h - 1 (portrait only).
+    # Row y + offset is shown at the top of the area and the rows wrap
+    # around inside it. The framebuffer is not changed.
+    # Rows are stored bottom-up in display memory (see show_rect()), so the
+    # area starts at memory row tfa = height - y - h and the start address
+    # counts backwards: memory row tfa + k shows tfa + (k - offset) mod h.
+    # offset = 0 with the whole area ends scrolling.
+    def vscroll(self, offset, y=0, h=None):
+        ht = self.height
+        if h is None:
+            h = ht - y
+        tfa = ht - y - h
+        if self._scroll_area != (y, h):
+            self._scroll_area = (y, h)
+            sb = self._scrbuf
+            sb[0] = tfa >> 8
+            sb[1] = tfa & 0xff
+            sb[2] = h >> 8
+            sb[3] = h & 0xff
+            sb[4] = y >> 8  # Bottom fixed area
+            sb[5] = y & 0xff
+            self._wcd(b'\x33', sb)  # VSCRDEF
+        ssa = tfa + (-offset) % h
+        sb = self._winbuf
+        sb[0] = ssa >> 8
+        sb[1] = ssa & 0xff
+        self._wcd(b'\x37', sb[:2])  # VSCSAD
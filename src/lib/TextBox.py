@@ -1,5 +1,4 @@
-from framebuf import FrameBuffer, MONO_VLSB, RGB565
-import gc
+from framebuf import FrameBuffer, MONO_VLSB, RGB565, GS8
 
 """
 V2 - 23.05.2025
@@ -19,9 +18,12 @@ TFT display. Use subclasses acording to the display:
     Initialization:
     
         MyBox = TextBoxTFT(display, caption = '', pos = 0,
-                 fg_color = (255, 255, 255), bg_color = (0, 0, 0)
+                 fg_color = (255, 255, 255), bg_color = (0, 0, 0),
+                 low_memory = False, pool = False, font = None)
                  
-        MyBox = TextBoxOLED(display, caption = '', pos = 0)
+        MyBox = TextBoxOLED(display, caption = '', pos = 0,
+                            low_memory = False, pool = False,
+                            page_aligned = False, font = None)
         
         Parameters: display:    Display object obtained from SSD1306
                                 driver / ST7735R driver: object
@@ -37,11 +39,24 @@ TFT display. Use subclasses acording to the display:
                     pos: Vertical position of the TextBox: int
                     fg_color : Foreground color, RGB tuple: tuple
                     bg_color : Background color, RGB tuple: tuple
+                    low_memory: Lines keep only their text and are
+                                drawn straight into the display's
+                                FrameBuffer: bool
+                    pool: Allocate the line buffers for as many lines
+                          as fit on the display at creation: bool
+                    page_aligned: OLED only, caption and lines are one
+                          8 pixel page high (no padding) and copied
+                          into the display buffer as bytes. pos
+                          should be a multiple of 8: bool
+                    font: Bitmap font, see TextBoxFont.
+                          None: built-in 8 * 8 font: Font
     
     Methods:
     
          line = MyBox.          content: Text content of the line: str
-            add_line(content):  line: line-id for later updates: var
+            add_line(content,   before: line-id, insert the line above
+                     before):           this line instead of appending: int
+                                line: line-id for later updates: int
                                 -> Must be called before show()
             
         MyBox.show(): Calculate the box size and line positions
@@ -56,6 +71,25 @@ TFT display. Use subclasses acording to the display:
         
         MyBox.update_line(line, txt): line: line-id: var
                                         txt: Text to update the line with: str
+        
+        line = MyBox.add_field_line(template, before):
+                                    template: static text with fields
+                                    {name:chars} (right aligned) or
+                                    {name:<chars} (left aligned): str
+                                    -> Must be called before show()
+        
+        MyBox.update_field(line, name, value): Draw and send only the
+                                    field name of a field line
+        
+        MyBox.update_number(line, value, width = 6, decimals = 0,
+                            scaled = False):
+                                    Show the number value right aligned
+                                    in width characters without
+                                    allocating memory.
+                                    scaled: value is an int holding
+                                    value * 10 ** decimals: bool
+                                    NaN, infinity and numbers which
+                                    do not fit are shown as '#'.
                                         
         MyBox.invert_color(line): line: line-id: var
                                     -> switches fg and bg color of line
@@ -63,29 +97,216 @@ TFT display. Use subclasses acording to the display:
                                     
         MyBox.delete_line(line): line: line-id: var
                                     -> Delete line
+        
+        lines = MyBox.add_lines(contents): contents: iterable of str
+                                    -> returns list of line-ids
+        
+        MyBox.update_lines(values): values: dict {line-id: txt}
+                                    -> updates all lines with one refresh
+        
+        MyBox.memory_usage(): -> dict {'lines': number of lines,
+                                       'buffers': bytes of line buffers,
+                                       'pool': bytes of unused
+                                               pooled buffers,
+                                       'text': characters of text}
+        
+        MyBox.begin() / MyBox.commit(): Collect the changes of all
+                                    calls in between and refresh the
+                                    changed area once on commit()
+                                    -> update_line() only stores the
+                                    text, lines are drawn on commit()
+                                    
+                                    with MyBox:
+                                        MyBox.update_line(line_1, 'A')
+                                        MyBox.update_caption('B')
     
     Properties:        
         MyBox.box_y: Vertical position of the box
         MyBox.box_h: Height of the box
+        
+    Low memory mode:
+        By default each line keeps its own FrameBuffer (width * 10
+        pixels) and is copied to the display with one blit. With
+        low_memory = True lines keep only text and colors and are
+        rendered into the display's FrameBuffer whenever they are drawn.
+        This saves 1240 bytes per line on the ST7735R at the cost of
+        drawing the text again when lines move.
+        
+    Buffer pool:
+        With pool = True the line buffers for the maximum number of
+        lines are allocated when the box is created. add_line() takes
+        a buffer from the pool and delete_line() returns it, so adding
+        and deleting lines allocates no buffers and causes no garbage
+        collection.
+        
+    Glyph cache:
+        Text is drawn from pre-rendered character tiles which are
+        shared by all boxes. Tiles are kept for 4 color sets
+        (fg_color, bg_color, format and font) by default:
+        
+        TextBox.glyphs = GlyphCache(8): Keep tiles for 8 color sets
+        TextBox.glyphs = None: Draw with FrameBuffer.text() or
+                               Font.draw() instead
+    
+    Fonts:
+        With font = Font(...) (see TextBoxFont) lines are as high as
+        the font and characters can have different widths. Text is
+        trimmed to the pixels available instead of 15 characters.
                                     
         
         
         
 """
-class TextBox:    
-    def __init__(self, display, caption = '', pos = 0):
-        # Save parameters
+# 2 * 1 FrameBuffer mapping the pixels of a font to bg_color, fg_color
+# One palette per format is shared by all boxes
+_palettes = {}
+
+def palette(fg_color, bg_color, mode, buffer):
+    p = _palettes.get(mode)
+    if p is None:
+        p = buffer(2, 1)
+        _palettes[mode] = p
+    p.pixel(0, 0, bg_color)
+    p.pixel(1, 0, fg_color)
+    return p
+
+
+# Cache of pre-rendered character tiles
+# A tile is a FrameBuffer holding one character in fg_color on bg_color.
+# Tiles of the same fg_color, bg_color, mode and font form a set: a list
+# indexed by character code (by glyph index for a Font), filled when a
+# character is first drawn. Sets are found by comparing their colors,
+# so drawing from the cache allocates nothing. Once size sets are in
+# use the oldest one is dropped.
+class GlyphCache:
+    def __init__(self, size = 4, font_width = 8, font_height = 8):
+        self.size = size
+        self.font_width = font_width
+        self.font_height = font_height
+        self.sets = [] # (fg_color, bg_color, mode, font, tiles)
+    
+    # Tile list for fg_color on bg_color in mode
+    # font: Font (see TextBoxFont) or None for the built-in font
+    def tiles(self, fg_color, bg_color, mode, font = None):
+        for s in self.sets:
+            if s[0] == fg_color and s[1] == bg_color and s[2] == mode and s[3] is font:
+                return s[4]
+        if len(self.sets) >= self.size:
+            self.sets.pop(0)
+        tiles = [None] * (128 if font is None else font.count)
+        self.sets.append((fg_color, bg_color, mode, font, tiles))
+        return tiles
+    
+    # Tile of char from tiles, buffer is the FrameBuffer factory of the box
+    def tile(self, tiles, char, fg_color, bg_color, mode, buffer, font = None):
+        if font is None:
+            # text() draws the characters outside 32 - 126 as 127
+            i = ord(char)
+            if i < 32 or i > 127:
+                i = 127
+            tile = tiles[i]
+            if tile is None:
+                tile = tiles[i] = buffer(self.font_width, self.font_height)
+                tile.fill(bg_color)
+                tile.text(char, 0, 0, fg_color)
+            return tile
+        i = font.index(char)
+        tile = tiles[i]
+        if tile is None:
+            tile = tiles[i] = buffer(font.width(char), font.height)
+            font.draw(tile, char, 0, 0, palette(fg_color, bg_color, mode, buffer))
+        return tile
+    
+    def get(self, char, fg_color, bg_color, mode, buffer, font = None):
+        return self.tile(self.tiles(fg_color, bg_color, mode, font),
+                         char, fg_color, bg_color, mode, buffer, font)
+    
+    def clear(self):
+        self.sets = []
+
+
+# Collects the regions of a display changed by drawing and
+# sends them to the panel. Base class of TextBox and Screen
+class Batch:
+    def __init__(self, display):
         self.display = display
+        
+        # Use partial updates if the driver provides them
+        self._partial = hasattr(display, 'show_rect')
+        
+        # Batched updates: nesting depth and changed area x0, y0, x1, y1
+        self._batch = 0
+        self._dirty = None
+    
+    # Send a changed region of the display to the panel.
+    # Inside begin() / commit() the region is only recorded.
+    def _flush(self, x, y, w, h):
+        if self._batch:
+            d = self._dirty
+            if d is None:
+                self._dirty = [x, y, x + w, y + h]
+            else:
+                d[0] = min(d[0], x)
+                d[1] = min(d[1], y)
+                d[2] = max(d[2], x + w)
+                d[3] = max(d[3], y + h)
+        else:
+            self._send(x, y, w, h)
+    
+    # Falls back to a full refresh if the driver has no show_rect().
+    def _send(self, x, y, w, h):
+        if self._partial:
+            self.display.show_rect(x, y, w, h)
+        else:
+            self.display.show()
+    
+    # Start collecting changes. Calls may be nested
+    def begin(self):
+        self._batch += 1
+    
+    # Refresh the area changed since the outermost begin() once
+    def commit(self):
+        if self._batch > 0:
+            self._batch -= 1
+        d = self._dirty
+        if self._batch == 0 and d is not None:
+            self._dirty = None
+            self._send(d[0], d[1], d[2] - d[0], d[3] - d[1])
+    
+    def __enter__(self):
+        self.begin()
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.commit()
+
+
+class TextBox(Batch):    
+    # Shared by all boxes, set to None to disable
+    glyphs = GlyphCache()
+    
+    def __init__(self, display, caption = '', pos = 0, low_memory = False, pool = False,
+                 padding = 1, font = None):
+        super().__init__(display)
+        
+        # Save parameters
         self.caption = caption
         self.pos = pos
+        self.low_memory = low_memory
         
-        self.font_height= 8 # MPY standard monospace font
-        self.font_width = 8 # MPY standard monospace font
+        # Font, see TextBoxFont. None: MPY standard monospace font
+        self.font = font
+        if font is None:
+            self.font_height = 8
+            self.font_width = 8
+        else:
+            self.font_height = font.height
+            self.font_width = font.max_width
 
         # Configuration
         self.border = 2
-        self.caption_padding = 1
-        self.line_padding = 1
+        self.caption_padding = padding
+        self.line_padding = padding
         
         # Calculate values
         self.line_height = self.font_height + 2 * self.line_padding
@@ -93,28 +314,79 @@ class TextBox:
         self.content_skip = self.line_height + 2 * self.caption_padding
         
         # Declare variables
-        # Framebuffers
-        self.window_buffer = None
-        self.caption_buffer = None
-        
         # Line objects
         self.cap = None
-        self.lines = {}
+        self.lines = self.LineList()
         
         # Others
         self.height = 0
         self.line_num = 0
         self.lines_total = 0
         
+        # Lines with new content to draw on commit()
+        self._pending = []
+        
+        # Screen the box is placed on, see TextBoxScreen
+        self.screen = None
+        
+        # Character tiles of update_number(), see _number_tiles()
+        self._tiles = []
+        
+        # Free line buffers, see _take_buffer()
+        self.pool = None
+        self._pool_width = self.display_width - 2 * self.border
+        if pool and not low_memory:
+            _max_lines = (self.display_height - self.content_skip - self.border) // self.line_height
+            self.pool = [self.buffer(self._pool_width, self.line_height)
+                         for _ in range(_max_lines)]
+        
 
-    # Clear whole display    
+    # Clear the area of the box
     def clear(self):
-        self.window_buffer.fill(self.black)
-        self.display.blit(self.window_buffer, 0, self.pos)
-        self.display.show()
+        self.display.fill_rect(0, self.pos, self.display_width, self.height, self.black)
+        self._flush(0, self.pos, self.display_width, self.height)
     
     # Add text line. Returns line id which may be used for updating 
-    def add_line(self, content):
+    # The line is appended or inserted above the line with id before
+    def add_line(self, content, before = None):
+        return self._add(self.Line, self._trim_maxlen(str(content)), before)
+    
+    # Add a line of static text and fields, see FieldLine.
+    # Returns line id for update_field()
+    def add_field_line(self, template, before = None):
+        template = str(template)
+        if self._parse_template(template) is None:
+            return None
+        return self._add(self.FieldLine, template, before)
+    
+    # Split a field line template into static text (str) and
+    # fields [name, chars, left]. Returns None if it is malformed
+    def _parse_template(self, template):
+        parts = []
+        i = 0
+        while i < len(template):
+            j = template.find('{', i)
+            if j < 0:
+                j = len(template)
+            if j > i:
+                parts.append(template[i:j])
+            if j == len(template):
+                break
+            k = template.find('}', j)
+            if k < 0:
+                print('Error: add_field_line: Missing } in template.')
+                return None
+            name, _, spec = template[j + 1 : k].partition(':')
+            chars = spec.lstrip('<>')
+            if not name or not chars.isdigit():
+                print('Error: add_field_line: Fields are {name:chars} or {name:<chars}.')
+                return None
+            parts.append([name, int(chars), spec.startswith('<')])
+            i = k + 1
+        return parts
+    
+    # Create a line of class line_class and insert it
+    def _add(self, line_class, content, before):
         self.lines_total += 1 # sic!
         # Calculate max available space for text lines
         _max_line_space =  self.display_height - self.content_skip - self.border
@@ -122,58 +394,150 @@ class TextBox:
             self.lines_total -= 1 # sic!
             print('Error: add_line: Too many lines.')
         else: 
-            new_line = self.Line(self, self._trim_maxlen(str(content)),
-                                 self.fg_color, self.bg_color, self.border)
+            if before is not None:
+                before = self._line(before)
+                if before is None:
+                    self.lines_total -= 1
+                    print('Error: add_line: Wrong line index.')
+                    return None
+            new_line = line_class(self, content, self.fg_color, self.bg_color, self.border)
             
-            self.lines[str(new_line.num)] = new_line
-            return str(new_line.num)
+            self.lines.insert(new_line, before)
+            return new_line.num
+    
+    # Add several text lines. Returns list of line ids
+    def add_lines(self, contents):
+        return [self.add_line(content) for content in contents]
         
     # Update box position
-    # Need to call show() afterwards
     def set_pos(self, pos):
+        self.begin()
         self.clear() # Call clear() first since it uses self.pos
         self.pos = pos
         self.show()
+        self.commit()
         
     # Draw the box with all lines and caption
+    # The box is drawn straight into the display's FrameBuffer,
+    # the caption Line is created once and kept
     def show(self):
-        # Clear old window buffer
-        if not (self.window_buffer is None):
-            self.clear()
-        # calculate box height
-        #             |        height of all lines        || caption + padding || border bottom |
-        self.height = self.line_height * (self.lines_total) + self.content_skip + self.border
-        
-        # Create buffer for MSGBOX
+        height = self._box_height()
+        
+        # Clear the strip left over if the box got smaller
+        old_height = self.height
+        if old_height > height:
+            self.display.fill_rect(0, self.pos + height, self.display_width,
+                                   old_height - height, self.black)
+        self.height = height
+        
+        # Create Line object for caption
+        if self.cap is None:
+            self.cap = self.Line(self, self._trim_maxlen(str(self.caption)),
+                                 self.bg_color, self.fg_color, int(self.border/2))
+        
+        self._draw()
+        self._flush(0, self.pos, self.display_width, max(height, old_height))
+        self._resized(old_height)
+    
+    # Draw caption and lines of a shown box without sending them
+    def _draw(self):
+        self._draw_caption()
+        self._draw_lines(self.lines.first, 0)
+    
+    # Let the Screen move the boxes below if the height changed
+    def _resized(self, old_height):
+        if self.screen is not None and self.height != old_height:
+            self.screen._relocate(self)
+    
+    # Draw caption, caption background and top of the text area
+    def _draw_caption(self):
         # Set color for caption background and border
-        self.window_buffer = self.buffer(self.display_width, self.height)
-        self.window_buffer.fill(self.fg_color)
-        
-        # Draw the (black) background of the textarea
-        _x = self.border
-        _y = self.content_skip - 1
-        _w = self.display_width - 2 * (self.border)
-        _h = self.line_height * (self.lines_total)
-        self.window_buffer.rect(_x, _y, _w, _h, self.bg_color, 1)
-        
-        # Create Line object for caption and draw it to window buffer
-        self.cap = self.Line(self, self._trim_maxlen(str(self.caption)),
-                             self.bg_color, self.fg_color, int(self.border/2))
-        
-        self.cap.show_line(self.window_buffer, self.caption_padding)
-        
-        # Create Line objects for text lines and draw them to window buffer
-        # in ascending order determined by their ids
-        # This preserves order after deleting lines
-        _pos = 0
-        for key, value in sorted(self.lines.items()):
-            value.show_line(self.window_buffer, self.content_skip + self.line_height * _pos)
-            value.rel_pos = self.content_skip + self.line_height * _pos
-            _pos += 1
-            
-        # Draw window buffer to display and show it
-        self.display.blit(self.window_buffer, 0, self.pos)
-        self.display.show()
+        self.display.fill_rect(0, self.pos, self.display_width, self.content_skip, self.fg_color)
+        
+        # The (black) background of the textarea starts one row above the first line
+        # unless that row belongs to the caption line (no padding)
+        if self.lines_total > 0 and self.content_skip > self.caption_padding + self.line_height:
+            self.display.fill_rect(self.border, self.pos + self.content_skip - 1,
+                                   self.display_width - 2 * self.border, 1, self.bg_color)
+        
+        self.cap.rel_pos = self.caption_padding
+        self.cap.show_line(self.display, self._abs_pos(self.cap))
+    
+    # calculate box height
+    def _box_height(self):
+        #      |        height of all lines        || caption + padding || border bottom |
+        return self.line_height * (self.lines_total) + self.content_skip + self.border
+    
+    # Draw border, background and lines from line, which is at
+    # position index, to the bottom of the box.
+    # Lines are blitted from their buffers in the order of the line list
+    def _draw_lines(self, line, index):
+        _y = self.pos + self.content_skip + self.line_height * index
+        _bottom = self.pos + self.height
+        # Border
+        self.display.fill_rect(0, _y, self.display_width, _bottom - _y, self.fg_color)
+        # Background of the textarea
+        _h = self.pos + self.content_skip - 1 + self.line_height * self.lines_total - _y
+        if _h > 0:
+            self.display.fill_rect(self.border, _y, self.display_width - 2 * self.border,
+                                   _h, self.bg_color)
+        
+        while line is not None:
+            line.rel_pos = self.content_skip + self.line_height * index
+            line.show_line(self.display, self._abs_pos(line))
+            line = line.next
+            index += 1
+    
+    # Draw text at x, y into buffer. The character cells are filled with
+    # bg_color, the padding around them is left untouched.
+    def _text(self, buffer, txt, x, y, fg_color, bg_color):
+        glyphs = self.glyphs
+        font = self.font
+        if glyphs is None:
+            if font is None:
+                buffer.fill_rect(x, y, len(txt) * self.font_width, self.font_height, bg_color)
+                buffer.text(txt, x, y, fg_color)
+                return
+            p = palette(fg_color, bg_color, self.mode, self.buffer)
+            for char in txt:
+                font.draw(buffer, char, x, y, p)
+                x += font.width(char)
+            return
+        mode = self.mode
+        tiles = glyphs.tiles(fg_color, bg_color, mode, font)
+        tile = glyphs.tile
+        if font is None:
+            for char in txt:
+                buffer.blit(tile(tiles, char, fg_color, bg_color, mode, self.buffer), x, y)
+                x += self.font_width
+            return
+        for char in txt:
+            buffer.blit(tile(tiles, char, fg_color, bg_color, mode, self.buffer, font), x, y)
+            x += font.width(char)
+    
+    # Changes of a box on a Screen are sent through the Screen
+    def _send(self, x, y, w, h):
+        if self.screen is not None:
+            self.screen._flush(x, y, w, h)
+        else:
+            super()._send(x, y, w, h)
+    
+    # Refresh the area changed since the outermost begin() once
+    def commit(self):
+        if self._batch == 1:
+            # Draw lines updated in the batch, the latest content wins
+            pending = self._pending
+            while pending:
+                line = pending.pop()
+                content = line.pending
+                line.pending = None
+                self._render_line(line, content)
+        super().commit()
+    
+    # Send the changed span of a single line to the panel
+    def _flush_line(self, line):
+        self._flush(line.posx + line.dirty_x0, line.posy,
+                    line.dirty_x1 - line.dirty_x0, self.line_height)
     
     @property
     def box_h(self):
@@ -183,65 +547,290 @@ class TextBox:
     def box_y(self):
         return self.pos
     
+    # Bytes of line buffers and characters of text held by the box.
+    # The glyph cache is shared by all boxes and not included
+    def memory_usage(self):
+        lines = list(self.lines)
+        if self.cap is not None:
+            lines.append(self.cap)
+        buffers = 0
+        text = 0
+        for line in lines:
+            if line.line_buffer is not None:
+                buffers += self.buffer_size(line.width, self.line_height)
+            text += len(line.content)
+        pool = 0
+        if self.pool is not None:
+            pool = len(self.pool) * self.buffer_size(self._pool_width, self.line_height)
+        return {'lines': len(self.lines), 'buffers': buffers, 'pool': pool, 'text': text}
+    
+    # Line buffer for a new line, taken from the pool if possible
+    def _take_buffer(self, width):
+        if self.pool and width == self._pool_width:
+            return self.pool.pop()
+        return self.buffer(width, self.line_height)
+    
+    # Return the buffer of a deleted line to the pool
+    def _give_buffer(self, line):
+        if (self.pool is not None and line.line_buffer is not None
+                and line.width == self._pool_width):
+            self.pool.append(line.line_buffer)
+            line.line_buffer = None
+    
     # Trim strings to prevent text overflow in lines
+    # Text starts at line_padding and keeps line_padding to the right
     def _trim_maxlen(self, txt):
-        if (len(txt) * self.font_width) > self.clip_x:
-            maxlen = (self.clip_x // 8)
-            return txt[0:maxlen]
-        else:
-            return txt
+        n = self._fit(txt, self.clip_x - 2 * self.line_padding)
+        if n < len(txt):
+            return txt[0:n]
+        return txt
+    
+    # Width of txt in pixels
+    def _text_width(self, txt):
+        if self.font is not None:
+            return self.font.text_width(txt)
+        return len(txt) * self.font_width
+    
+    # Number of characters of txt that fit into width pixels
+    def _fit(self, txt, width):
+        if self.font is not None:
+            return self.font.fit(txt, width)
+        return min(len(txt), max(width, 0) // self.font_width)
 
+    # Get Line object by line id or None
+    # Ids given as str (as returned by earlier versions) are accepted
+    def _line(self, lid):
+        if isinstance(lid, str) and lid.isdigit():
+            lid = int(lid)
+        return self.lines.get(lid)
+    
     def delete_line(self, lid):
-        _lid = str(lid)
-        if _lid in self.lines:
+        line = self._line(lid)
+        if line is not None:
+            if line.pending is not None:
+                self._pending.remove(line)
+                line.pending = None
+            if (self.cap is None or self.lines_total == 1
+                    or self.height != self._box_height()):
+                # Not shown yet, last line or lines were added since
+                # show(): no lines on screen to move
+                self.lines_total -= 1
+                self.lines.remove(line)
+                self._give_buffer(line)
+                if self.cap is None:
+                    pass
+                elif self.lines_total == 0:
+                    self.clear() # Hide the box
+                else:
+                    self.show()
+                return
+            
+            # Move the lines below the deleted one up
+            # and clear the strip at the bottom
+            index = 0
+            prev = line.prev
+            while prev is not None:
+                index += 1
+                prev = prev.prev
+            below = line.next
+            old_height = self.height
             self.lines_total -= 1
-            self.lines.pop(_lid)
-            self.clear()
-            gc.collect()
-            if self.lines_total > 0:
-                self.show()
+            self.lines.remove(line)
+            self._give_buffer(line)
+            self.height -= self.line_height
+            self.display.fill_rect(0, self.pos + self.height, self.display_width,
+                                   self.line_height, self.black)
+            self._draw_lines(below, index)
+            
+            _y = self.pos + self.content_skip + self.line_height * index
+            self._flush(0, _y, self.display_width, self.pos + old_height - _y)
+            self._resized(old_height)
         else:
             print('Error: delete_line: Wrong line index.')
             return False
     
     def update_caption(self, caption):
         self.caption = self._trim_maxlen(caption)
-        self.cap.set_text_line(self.caption)
-        self.cap.show_line(self.display, self._abs_pos(self.cap))
-        self.display.show()
+        if self.cap.set_text_line(self.caption):
+            self.cap.show_line(self.display, self._abs_pos(self.cap))
+            self._flush_line(self.cap)
     
     def invert_color(self, lid):
-        _lid = str(lid)
-        if _lid in self.lines:
-            self.lines[_lid].invert_line()
-            self.lines[_lid].clear_line()
-            self.lines[_lid].set_text_line()
-            self.lines[_lid].show_line(self.display, self._abs_pos(_lid))
-            self.display.show()
+        line = self._line(lid)
+        if line is not None:
+            line.invert_line()
+            line.set_text_line()
+            line.show_line(self.display, self._abs_pos(line))
+            self._flush_line(line)
         else:
             print('Error: invert: Wrong line index.')
             return False
         
-    def _abs_pos(self, lid):
-        lid = self.lines[lid] if lid in self.lines else lid
-        return (lid.rel_pos + self.pos)
+    # Absolute position of a Line object on the display
+    def _abs_pos(self, line):
+        return (line.rel_pos + self.pos)
         
+    # Update several lines with one refresh
+    # values: dict {line-id: content}
+    def update_lines(self, values):
+        self.begin()
+        for lid, content in values.items():
+            self.update_line(lid, content)
+        self.commit()
+    
     def update_line(self, lid, content):
-        _lid = str(lid)
-        if _lid in self.lines:
-            self.lines[_lid].clear_line()
-            self.lines[_lid].set_text_line(str(content))
-            self.lines[_lid].show_line(self.display, self._abs_pos(_lid))
-            self.display.show()
+        line = self._line(lid)
+        if line is not None and line.fields is not None:
+            print('Error: update_line: Use update_field() for field lines.')
+            return False
+        if line is not None:
+            if self._batch:
+                # Only store the content, it is drawn on commit()
+                if line.pending is None:
+                    self._pending.append(line)
+                line.pending = str(content)
+            else:
+                self._render_line(line, str(content))
         else:
             print('Error: update_line: Wrong line index.')
             return False
     
+    # Draw new content into a line and send it to the display
+    # The content is trimmed like in add_line(), so characters which
+    # do not fit are neither drawn nor compared
+    def _render_line(self, line, content):
+        # Nothing to do if the text is unchanged
+        if line.set_text_line(self._trim_maxlen(content)):
+            line.show_line(self.display, self._abs_pos(line))
+            self._flush_line(line)
+    
+    # Show a number in the first width character cells of a line.
+    # Digits are written into a buffer of the line and only the cells
+    # that changed are drawn and sent. Nothing is allocated per call
+    # for int values and scaled values. A float needs temporary floats
+    # for rounding on ports which keep floats on the heap.
+    def update_number(self, lid, value, width = 6, decimals = 0, scaled = False):
+        line = self._line(lid)
+        if line is None or line.fields is not None:
+            print('Error: update_number: Wrong line index.')
+            return False
+        if self.line_padding + width * self.font_width > line.width:
+            print('Error: update_number: Number too wide.')
+            return False
+        if width < (decimals + 2 if decimals else 1):
+            print('Error: update_number: Too many decimals.')
+            return False
+        if scaled and not isinstance(value, int):
+            print('Error: update_number: Scaled value must be an int.')
+            return False
+        if line.pending is not None:
+            # The number replaces the text stored by update_line()
+            self._pending.remove(line)
+            line.pending = None
+        if line.set_number(value, width, decimals, scaled) and self.cap is not None:
+            line.show_line(self.display, self._abs_pos(line))
+            self._flush_line(line)
+    
+    # Tiles of the characters of numbers in fg_color on bg_color,
+    # indexed by character code. Tiles are kept for two color pairs
+    # (normal and inverted lines), a third pair replaces the oldest.
+    # The pairs are compared without building a key, so finding the
+    # tiles allocates nothing
+    def _number_tiles(self, fg_color, bg_color):
+        for t in self._tiles:
+            if t[0] == fg_color and t[1] == bg_color:
+                return t[2]
+        tiles = [None] * 64
+        for c in b' #-.0123456789':
+            tile = self.buffer(self.font_width, self.font_height)
+            tile.fill(bg_color)
+            self._text(tile, chr(c), 0, 0, fg_color, bg_color)
+            tiles[c] = tile
+        if len(self._tiles) == 2:
+            self._tiles.pop(0)
+        self._tiles.append((fg_color, bg_color, tiles))
+        return tiles
+    
+    # Set field name of a field line. Only the pixels of the field are
+    # drawn and sent, also inside begin() / commit()
+    def update_field(self, lid, name, value):
+        line = self._line(lid)
+        field = None
+        if line is not None and line.fields is not None:
+            field = line.fields.get(name)
+        if field is None:
+            print('Error: update_field: Wrong line index or field name.')
+            return False
+        if line.set_field(field, str(value)) and self.cap is not None:
+            line.show_field(self.display, self._abs_pos(line), field)
+            self._flush(line.posx + field[0], line.posy, field[1], self.line_height)
+    
+    # Ordered collection of Line objects
+    # Lines are found by their integer id through a dict and kept in
+    # order in a doubly linked list (Line.prev / Line.next), so lines
+    # can be inserted anywhere without renumbering or sorting
+    class LineList:
+        def __init__(self):
+            self.ids = {}
+            self.first = None
+            self.last = None
+        
+        def __len__(self):
+            return len(self.ids)
+        
+        def __contains__(self, lid):
+            return lid in self.ids
+        
+        # Line objects in display order
+        def __iter__(self):
+            line = self.first
+            while line is not None:
+                yield line
+                line = line.next
+        
+        def get(self, lid):
+            return self.ids.get(lid)
+        
+        # Insert line above the Line object before or append it
+        def insert(self, line, before = None):
+            if before is None:
+                line.prev = self.last
+                line.next = None
+                if self.last is None:
+                    self.first = line
+                else:
+                    self.last.next = line
+                self.last = line
+            else:
+                line.prev = before.prev
+                line.next = before
+                if before.prev is None:
+                    self.first = line
+                else:
+                    before.prev.next = line
+                before.prev = line
+            self.ids[line.num] = line
+        
+        def remove(self, line):
+            if line.prev is None:
+                self.first = line.next
+            else:
+                line.prev.next = line.next
+            if line.next is None:
+                self.last = line.prev
+            else:
+                line.next.prev = line.prev
+            line.prev = line.next = None
+            del self.ids[line.num]
+    
     # Line class creates individual FrameBuffers
     # and provides a static id for each line
     # This way lines can be updated individually without
     # redrawing the whole screen buffer
     class Line:
+        # Fields of a FieldLine by name
+        fields = None
+        
         def __init__(self, parent, content, fg_color, bg_color, posx = 0):
             # Preserve the 'self' scope of the MSGBOX class
             self.parent = parent
@@ -253,41 +842,337 @@ class TextBox:
             self.rel_pos = 0 # relative position in box
                              # updated when parent.show() is called
             
+            # Neighbours in the parent's LineList
+            self.prev = None
+            self.next = None
+            
+            # Content stored by update_line() inside begin() / commit()
+            self.pending = None
+            
+            # Characters drawn by update_number() and the buffer the
+            # next number is formatted into. None if the line shows text
+            self.number = None
+            self._digits = None
+            
+            # What is currently drawn in the line buffer
+            # and the x-span changed by the last set_text_line()
+            self.drawn = None
+            self.drawn_fg = None
+            self.drawn_bg = None
+            self.dirty_x0 = 0
+            self.dirty_x1 = 0
+            
             # Assign an ascending id to each line
             self.num = self.parent.line_num
             self.parent.line_num += 1
             
             # Create individual FB for each line
-            self.line_buffer = self.parent.buffer(self.parent.display_width - 2 * self.posx,
-                                                   self.parent.line_height)
+            # In low memory mode the line is drawn by show_line()
+            self.width = self.parent.display_width - 2 * self.posx
+            if self.parent.low_memory:
+                self.line_buffer = None
+            else:
+                self.line_buffer = self.parent._take_buffer(self.width)
             self.set_text_line(str(self.content))
         
         # Draw line to display or window buffer
         def show_line(self, buffer, posy):
             self.posy = posy
             
-            buffer.blit(self.line_buffer, self.posx, self.posy)
+            if self.line_buffer is None and self.number is not None:
+                buffer.fill_rect(self.posx, posy, self.width,
+                                 self.parent.line_height, self.bg_color)
+                self._draw_cells(buffer, self.posx, posy, 0, len(self.number))
+            elif self.line_buffer is None:
+                buffer.fill_rect(self.posx, posy, self.width,
+                                 self.parent.line_height, self.bg_color)
+                pad = self.parent.line_padding
+                self.parent._text(buffer, self.drawn, self.posx + pad, posy + pad,
+                                  self.fg_color, self.bg_color)
+            else:
+                buffer.blit(self.line_buffer, self.posx, self.posy)
             
         def clear_line(self):
-            self.line_buffer.fill(self.bg_color)
+            if self.line_buffer is not None:
+                self.line_buffer.fill(self.bg_color)
         
         # Set the text content of the line
         # Either update text or
         # redraw previously set text
         # (neccessary for invert function)
         # when fg_ and bg_color have changed
+        # Returns False if the line buffer did not change.
+        # Otherwise dirty_x0 / dirty_x1 hold the changed x-span
         def set_text_line(self, content = None):
+            if content is not None:
+                self.content = content
+                if self.number is not None:
+                    # The line showed a number, draw the whole text
+                    self.number = None
+                    self.drawn = None
+            elif self.number is not None:
+                # Redraw the number if the colors changed
+                if self.drawn_fg == self.fg_color and self.drawn_bg == self.bg_color:
+                    return False
+                return self._set_cells(self.number, True)
+            content = str(self.content)
             
-            self.content = ' ' if content is None else content
-                
-            self.clear_line()
+            if (self.drawn is not None and self.drawn_fg == self.fg_color
+                    and self.drawn_bg == self.bg_color):
+                if content == self.drawn:
+                    return False
+                return self._diff_text(content)
+            
+            if self.line_buffer is not None:
+                self.clear_line()
+                self.parent._text(self.line_buffer, content, self.parent.line_padding,
+                                  self.parent.line_padding, self.fg_color, self.bg_color)
+            self.drawn = content
+            self.drawn_fg = self.fg_color
+            self.drawn_bg = self.bg_color
+            self.dirty_x0 = 0
+            self.dirty_x1 = self.width
+            return True
+        
+        # Redraw only the 8 pixel character cells that differ
+        # between the drawn text and the new text
+        def _diff_text(self, content):
+            if self.parent.font is not None:
+                return self._diff_font(content)
+            old = self.drawn
+            fw = self.parent.font_width
+            pad = self.parent.line_padding
+            h = self.parent.line_height
+            first = -1
+            last = -1
+            for i in range(max(len(old), len(content))):
+                c = content[i] if i < len(content) else None
+                if i < len(old) and old[i] == c:
+                    continue
+                # Low memory mode: only the changed span is needed
+                if self.line_buffer is not None:
+                    x = pad + i * fw
+                    if c is None:
+                        self.line_buffer.fill_rect(x, 0, fw, h, self.bg_color)
+                    else:
+                        self.parent._text(self.line_buffer, c, x, pad,
+                                          self.fg_color, self.bg_color)
+                if first < 0:
+                    first = i
+                last = i
+            self.drawn = content
+            self.dirty_x0 = pad + first * fw
+            self.dirty_x1 = min(pad + (last + 1) * fw, self.width)
+            return True
+        
+        # With a Font characters can have different widths: everything
+        # from the first changed character on is redrawn
+        def _diff_font(self, content):
+            old = self.drawn
+            font = self.parent.font
+            pad = self.parent.line_padding
+            k = 0
+            n = min(len(old), len(content))
+            while k < n and old[k] == content[k]:
+                k += 1
+            x = pad + font.text_width(content[:k])
+            end = min(pad + max(font.text_width(old), font.text_width(content)), self.width)
+            if self.line_buffer is not None:
+                self.line_buffer.fill_rect(x, 0, end - x, self.parent.line_height, self.bg_color)
+                self.parent._text(self.line_buffer, content[k:], x, pad,
+                                  self.fg_color, self.bg_color)
+            self.drawn = content
+            self.dirty_x0 = x
+            self.dirty_x1 = end
+            return True
             
-            self.line_buffer.text(str(self.content), self.parent.line_padding,
-                                  self.parent.line_padding, self.fg_color)
+        # Format value right aligned into width characters and draw the
+        # cells that changed. The number is filled with '#' if it does
+        # not fit. Returns False if nothing changed
+        def set_number(self, value, width, decimals, scaled):
+            chars = self._digits
+            if chars is None or len(chars) != width:
+                chars = self._digits = bytearray(width)
+            if scaled:
+                n = value
+            elif isinstance(value, int):
+                n = value * 10 ** decimals
+            elif value - value != 0:
+                # NaN or infinity does not fit like a too large number
+                n = 10 ** width
+            else:
+                n = int(value * 10 ** decimals + (0.5 if value >= 0 else -0.5))
+            negative = n < 0
+            if negative:
+                n = -n
+            k = width - 1
+            for _ in range(decimals):
+                chars[k] = 48 + n % 10 # '0'
+                n //= 10
+                k -= 1
+            if decimals:
+                chars[k] = 46 # '.'
+                k -= 1
+            while k >= 0:
+                chars[k] = 48 + n % 10
+                n //= 10
+                k -= 1
+                if n == 0:
+                    break
+            if negative and k >= 0:
+                chars[k] = 45 # '-'
+                k -= 1
+                negative = False
+            if n or negative:
+                # Does not fit
+                for i in range(width):
+                    chars[i] = 35 # '#'
+            while k >= 0:
+                chars[k] = 32 # ' '
+                k -= 1
             
+            number = self.number
+            if (number is None or len(number) != width or self.drawn_fg != self.fg_color
+                    or self.drawn_bg != self.bg_color):
+                # First number, other width or colors changed
+                self.number = self.content = bytearray(chars)
+                return self._set_cells(self.number, True)
+            return self._set_cells(chars, False)
+        
+        # Copy chars into self.number and draw the cells which differ
+        # (all if full) into the line buffer
+        def _set_cells(self, chars, full):
+            number = self.number
+            fw = self.parent.font_width
+            pad = self.parent.line_padding
+            first = -1
+            last = -1
+            for i in range(len(chars)):
+                c = chars[i]
+                if not full and number[i] == c:
+                    continue
+                number[i] = c
+                if first < 0:
+                    first = i
+                last = i
+            if first < 0:
+                return False
+            if self.line_buffer is not None:
+                if full:
+                    self.clear_line()
+                self._draw_cells(self.line_buffer, 0, 0, first, last + 1)
+            self.drawn_fg = self.fg_color
+            self.drawn_bg = self.bg_color
+            if full:
+                self.dirty_x0 = 0
+                self.dirty_x1 = self.width
+            else:
+                self.dirty_x0 = pad + first * fw
+                self.dirty_x1 = pad + (last + 1) * fw
+            return True
+        
+        # Blit the tiles of the number cells start to end - 1
+        # with the line at x0, y0
+        def _draw_cells(self, buffer, x0, y0, start, end):
+            tiles = self.parent._number_tiles(self.fg_color, self.bg_color)
+            number = self.number
+            fw = self.parent.font_width
+            x = x0 + self.parent.line_padding + start * fw
+            y = y0 + self.parent.line_padding
+            for i in range(start, end):
+                buffer.blit(tiles[number[i]], x, y)
+                x += fw
+        
         # Sawp fg_ and bg_color
         def invert_line(self):
             self.fg_color, self.bg_color = self.bg_color, self.fg_color
+    
+    # Line of static text with fields of fixed width
+    # The template holds the static text and the fields as
+    # {name:chars} (right aligned) or {name:<chars} (left aligned).
+    # A field is chars * font_width pixels wide, so the static text
+    # never moves. The static text is drawn only when the whole line
+    # is drawn, update_field() draws only the pixels of one field.
+    # content is the template.
+    class FieldLine(Line):
+        def __init__(self, parent, template, fg_color, bg_color, posx = 0):
+            # parts: (x, static text) or field [x, width, chars, left, value]
+            self.parts = []
+            self.fields = {}
+            end = parent.display_width - 2 * posx
+            x = parent.line_padding
+            for part in parent._parse_template(template):
+                if isinstance(part, str):
+                    txt = part[0:parent._fit(part, end - x)]
+                    self.parts.append((x, txt))
+                    x += parent._text_width(txt)
+                else:
+                    name, chars, left = part
+                    width = max(0, min(chars * parent.font_width, end - x))
+                    field = [x, width, chars, left, '']
+                    self.parts.append(field)
+                    self.fields[name] = field
+                    x += width
+            super().__init__(parent, template, fg_color, bg_color, posx)
+        
+        # Draw the whole line only if it was not drawn or the colors changed
+        def set_text_line(self, content = None):
+            if (self.drawn is not None and self.drawn_fg == self.fg_color
+                    and self.drawn_bg == self.bg_color):
+                return False
+            if self.line_buffer is not None:
+                self.clear_line()
+                self._draw(self.line_buffer, 0, 0)
+            self.drawn = self.content
+            self.drawn_fg = self.fg_color
+            self.drawn_bg = self.bg_color
+            self.dirty_x0 = 0
+            self.dirty_x1 = self.width
+            return True
+        
+        def show_line(self, buffer, posy):
+            if self.line_buffer is None:
+                self.posy = posy
+                buffer.fill_rect(self.posx, posy, self.width,
+                                 self.parent.line_height, self.bg_color)
+                self._draw(buffer, self.posx, posy)
+            else:
+                super().show_line(buffer, posy)
+        
+        # Draw a field straight into the display
+        def show_field(self, buffer, posy, field):
+            self.posy = posy
+            self._draw_field(buffer, field, self.posx, posy)
+        
+        # Store the value of field. Returns False if it is unchanged
+        def set_field(self, field, value):
+            value = value[0:field[2]]
+            value = value[0:self.parent._fit(value, field[1])]
+            if value == field[4]:
+                return False
+            field[4] = value
+            if self.line_buffer is not None:
+                self._draw_field(self.line_buffer, field, 0, 0)
+            return True
+        
+        # Draw static text and fields with the line at x0, y0
+        def _draw(self, buffer, x0, y0):
+            pad = self.parent.line_padding
+            for part in self.parts:
+                if isinstance(part, tuple):
+                    self.parent._text(buffer, part[1], x0 + part[0], y0 + pad,
+                                      self.fg_color, self.bg_color)
+                else:
+                    self._draw_field(buffer, part, x0, y0)
+        
+        def _draw_field(self, buffer, field, x0, y0):
+            x, width, _, left, value = field
+            parent = self.parent
+            buffer.fill_rect(x0 + x, y0, width, parent.line_height, self.bg_color)
+            if not left:
+                x += width - parent._text_width(value)
+            parent._text(buffer, value, x0 + x, y0 + parent.line_padding,
+                         self.fg_color, self.bg_color)
 
 
 '''
@@ -301,7 +1186,8 @@ bg_color = background color, set as tuple (r, g, b)
 '''
 class TextBoxTFT(TextBox):
     def __init__(self, display, caption = '', pos = 0,
-                 fg_color = ((255,) * 3), bg_color = ((0,) * 3)):
+                 fg_color = ((255,) * 3), bg_color = ((0,) * 3),
+                 low_memory = False, pool = False, font = None):
         
         self.display = display
 
@@ -313,7 +1199,12 @@ class TextBoxTFT(TextBox):
         self.fg_color = self.rgb_color(fg_color) # Pass Tuple
         self.bg_color = self.rgb_color(bg_color) # Pass Tuple
         
-        super().__init__(self.display, caption, pos)
+        # Use the display's native format for all buffers so blits
+        # are same-format copies. Drivers without a mode attribute get RGB565
+        self.mode = getattr(self.display, 'mode', RGB565)
+        self.bytes_per_pixel = 1 if self.mode == GS8 else 2
+        
+        super().__init__(self.display, caption, pos, low_memory, pool, font = font)
     
     # Create RGB color from TUPLE: (r, g, b)
     # r, g, b: int = 0 - 255
@@ -321,9 +1212,14 @@ class TextBoxTFT(TextBox):
         _r, _g, _b = _rgb
         return self.display.rgb(_r, _g, _b)
     
-    # Create RGB565-FrameBuffer for TFT
+    # Create FrameBuffer for TFT in the display's format
+    # GS8 (rrrgggbb) for ST7735R, otherwise RGB565
     def buffer(self, width, height):
-        return FrameBuffer(bytearray(width * height * 2), width, height, RGB565)
+        return FrameBuffer(bytearray(self.buffer_size(width, height)),
+                           width, height, self.mode)
+    
+    def buffer_size(self, width, height):
+        return width * height * self.bytes_per_pixel
 
 
 '''
@@ -332,9 +1228,16 @@ Creates a black-white text box on a SSD1306 OLED Display
 display = OLED display object
 caption = caption of the Textbox
 pos = vertical position of the Textbox
+page_aligned = Caption and lines are 8 pixels high without padding.
+               If pos is a multiple of 8, every line is one page of
+               the display and is copied into the display buffer as
+               bytes instead of blitted pixel by pixel. Lines of a
+               font which is not 8 pixels high have no padding but
+               are blitted
 '''
 class TextBoxOLED(TextBox):
-    def __init__(self, display, caption = '', pos = 0):
+    def __init__(self, display, caption = '', pos = 0, low_memory = False, pool = False,
+                 page_aligned = False, font = None):
         
         self.display_width = 128
         self.display_height = 64
@@ -342,12 +1245,50 @@ class TextBoxOLED(TextBox):
         self.white = 1
         self.black = 0
         
+        self.mode = MONO_VLSB
+        
         self.fg_color = self.white
         self.bg_color = self.black
         
-        super().__init__(display, caption, pos)
+        self.page_aligned = page_aligned
+        
+        super().__init__(display, caption, pos, low_memory, pool, 0 if page_aligned else 1, font)
     
     # Create BW FrameBuffers for OLED   
+    # Buffers of one page keep their bytes for Line.show_line()
     def buffer(self, width, height):
-        return FrameBuffer(bytearray(width * height * 1), width, height, MONO_VLSB)
+        if self.page_aligned and height == 8:
+            return self.Page(width)
+        return FrameBuffer(bytearray(self.buffer_size(width, height)), width, height, MONO_VLSB)
+    
+    # MONO_VLSB: one byte holds a column of 8 pixels
+    def buffer_size(self, width, height):
+        return width * ((height + 7) // 8)
+    
+    # FrameBuffer of one page which keeps its bytes
+    class Page(FrameBuffer):
+        def __init__(self, width):
+            self.data = bytearray(width)
+            super().__init__(self.data, width, 8, MONO_VLSB)
     
+    # Lines of one page (8 pixels, no font of another height) on a
+    # page boundary are copied as bytes into the page
+    class Line(TextBox.Line):
+        def show_line(self, buffer, posy):
+            parent = self.parent
+            if (posy & 7 or buffer is not parent.display or self.line_buffer is None
+                    or not parent.page_aligned or parent.line_height != 8):
+                super().show_line(buffer, posy)
+                return
+            self.posy = posy
+            i = (posy >> 3) * parent.display_width + self.posx
+            buffer.buffer[i : i + self.width] = self.line_buffer.data
+    
+    # MicroPython resolves super() of TextBox.FieldLine to TextBox.Line,
+    # so the page copy of Line is called explicitly
+    class FieldLine(TextBox.FieldLine, Line):
+        def show_line(self, buffer, posy):
+            if self.line_buffer is None:
+                TextBox.FieldLine.show_line(self, buffer, posy)
+            else:
+                TextBoxOLED.Line.show_line(self, buffer, posy)
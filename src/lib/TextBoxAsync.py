@@ -0,0 +1,76 @@
+import asyncio
+from time import ticks_ms, ticks_diff
+
+"""
+Refreshes TextBoxes from an asyncio task at a limited frame rate.
+
+While the Refresher runs, update_line() only stores the new text of a
+line. The task draws all lines that changed since the last frame and
+refreshes the changed area of each box, at most fps times per second.
+If a line is updated several times between two frames only the last
+value is drawn.
+
+    Initialization:
+
+        refresher = Refresher(box_1, box_2, fps = 10)
+
+        Parameters: boxes: TextBox objects to refresh
+                    fps: Maximum number of refreshes per second: int
+
+    Methods:
+
+        refresher.start(): Start the refresh task, returns the task.
+                           Must be called from a running event loop.
+
+        refresher.stop(): Cancel the task and draw pending updates.
+
+        refresher.refresh(): Draw pending updates now.
+
+    Example:
+
+        async def main():
+            refresher = Refresher(BOX_1, fps = 10)
+            refresher.start()
+            while True:
+                BOX_1.update_line(line_1, str(read_sensor()))
+                await asyncio.sleep_ms(5)
+
+        asyncio.run(main())
+
+The refresh itself still blocks the event loop while the display is
+written, but it happens once per frame instead of once per update.
+"""
+class Refresher:
+    def __init__(self, *boxes, fps = 10):
+        self.boxes = boxes
+        self.period = 1000 // fps
+        self.task = None
+
+    def start(self):
+        if self.task is None:
+            # Keep the boxes collecting changes between frames
+            for box in self.boxes:
+                box.begin()
+            self.task = asyncio.create_task(self._run())
+        return self.task
+
+    def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+            for box in self.boxes:
+                box.commit()
+
+    # Draw all pending updates and refresh the changed areas
+    def refresh(self):
+        for box in self.boxes:
+            box.commit()
+            box.begin()
+
+    async def _run(self):
+        while True:
+            t0 = ticks_ms()
+            self.refresh()
+            # Wait for the rest of the frame
+            _wait = self.period - ticks_diff(ticks_ms(), t0)
+            await asyncio.sleep(max(_wait, 0) / 1000)
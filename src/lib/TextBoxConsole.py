@@ -0,0 +1,91 @@
+from TextBox import TextBox, TextBoxTFT, TextBoxOLED
+
+"""
+Console: log box using the hardware vertical scrolling of the panel
+
+The lines of the console are a ring in the display's framebuffer.
+A new line overwrites the oldest line and the panel is told to start
+the visible area one line further down. Adding a line renders and
+sends only that line, no matter how many lines are shown.
+
+The console has no caption and no border. Needs a driver with
+vscroll() (ST7735R in portrait orientation, SSD1306).
+While the console is used, its area must not be drawn by other boxes.
+
+    from TextBoxConsole import ConsoleTFT, ConsoleOLED
+    
+    MyConsole = ConsoleTFT(display, pos = 0, rows = None,
+                           fg_color = (255, 255, 255), bg_color = (0, 0, 0))
+    
+        rows: number of lines: int
+              None: as many as fit below pos
+    
+    MyConsole = ConsoleOLED(display)
+    
+        The SSD1306 scrolls only the whole display: the console
+        covers the display with 8 lines of 8 pixels
+
+    MyConsole.add_line(content): Append a line, the oldest line
+                                 scrolls out at the top
+    MyConsole.show(): Send the console area
+    MyConsole.clear(): Remove all lines
+"""
+class Console:
+    def _init_console(self, rows):
+        if rows is None:
+            rows = (self.display_height - self.pos) // self.line_height
+        self.rows = rows
+        self.height = rows * self.line_height
+        self.border = 0
+        self.clip_x = self.display_width
+        self.count = 0   # Lines added since clear()
+        self._offset = 0 # Row shown at the top of the area
+        self._scrolled = 0
+        # Render buffer for new lines
+        self._row = self.Line(self, '', self.fg_color, self.bg_color)
+        self.display.fill_rect(0, self.pos, self.display_width, self.height, self.bg_color)
+    
+    # Append a line. Returns the number of lines added since clear()
+    def add_line(self, content, before = None):
+        row = self._row
+        row.set_text_line(self._trim_maxlen(str(content)))
+        y = self.pos + (self.count % self.rows) * self.line_height
+        row.show_line(self.display, y)
+        self.count += 1
+        if self.count > self.rows:
+            # The oldest line is in the slot after the new one
+            self._offset = (self.count % self.rows) * self.line_height
+        self._flush(0, y, self.display_width, self.line_height)
+        return self.count
+    
+    def show(self):
+        self._flush(0, self.pos, self.display_width, self.height)
+    
+    def clear(self):
+        self.display.fill_rect(0, self.pos, self.display_width, self.height, self.bg_color)
+        self.count = 0
+        self._offset = 0
+        self.show()
+    
+    # Send the pixels, then move the start of the visible area
+    # Console has no base class: MicroPython's super() would not find
+    # TextBox._send(), so it is called explicitly
+    def _send(self, x, y, w, h):
+        TextBox._send(self, x, y, w, h)
+        if self._scrolled != self._offset:
+            self._scrolled = self._offset
+            self.display.vscroll(self._offset, self.pos, self.height)
+
+
+class ConsoleTFT(Console, TextBoxTFT):
+    def __init__(self, display, pos = 0, rows = None,
+                 fg_color = ((255,) * 3), bg_color = ((0,) * 3)):
+        TextBoxTFT.__init__(self, display, '', pos, fg_color, bg_color)
+        self._init_console(rows)
+
+
+class ConsoleOLED(Console, TextBoxOLED):
+    def __init__(self, display):
+        # Lines must tile the 64 display rows
+        TextBoxOLED.__init__(self, display, '', 0, page_aligned = True)
+        self._init_console(None)
@@ -0,0 +1,157 @@
+from framebuf import FrameBuffer, MONO_VLSB
+
+"""
+Bitmap fonts for TextBox, fixed or proportional, any height.
+
+A font is a compact binary atlas. The atlas is used in place, glyphs
+are not unpacked into separate objects:
+
+    Header (8 bytes):
+        b'TBF1', height: uint8, 0, count: uint16 little endian
+    Glyph table (count * 5 bytes, sorted by character code):
+        code: uint16, offset: uint16, width: uint8
+    Bitmaps:
+        Each glyph is width * ceil(height / 8) bytes in MONO_VLSB
+        format (a byte holds 8 pixels of a column, top pixel in bit 0)
+        at offset from the start of the bitmaps.
+
+    Initialization:
+
+        font = Font(data)
+        font = Font.load('font.tbf')
+
+        Parameters: data: atlas: bytes or bytearray
+                          A bytearray (e.g. read from a file) is drawn
+                          from in place. Glyphs of bytes (e.g. frozen
+                          into the firmware and read from flash) are
+                          copied into RAM when they are first drawn,
+                          because FrameBuffer needs a writable buffer.
+
+    The FrameBuffer of a glyph is created when the glyph is first
+    drawn and reused, drawing allocates no memory after that.
+
+    Methods:
+
+        font.index(char): Index of char in the glyph table
+        font.width(char): Width of char in pixels
+        font.text_width(txt): Width of txt in pixels
+        font.fit(txt, width): Number of characters of txt that fit
+                              into width pixels
+        font.draw(buffer, char, x, y, palette): Draw char into the
+                              FrameBuffer buffer. palette is a 2 * 1
+                              FrameBuffer in the format of buffer with
+                              the background color at 0, 0 and the
+                              foreground color at 1, 0
+
+        build(height, glyphs): Create an atlas -> bytes
+                              glyphs: dict {char: list of columns},
+                              a column is an int with the top pixel
+                              in bit 0. Fixed width fonts have columns
+                              of the same length for all characters.
+
+    Characters missing in the font are drawn as the first character
+    of the font.
+
+    Example:
+
+        font = Font.load('font.tbf')
+        BOX_1 = TextBoxTFT(display, caption = 'Box 1', font = font)
+"""
+class Font:
+    def __init__(self, data):
+        self._writable = not isinstance(data, bytes)
+        data = memoryview(data)
+        if bytes(data[0:4]) != b'TBF1':
+            raise ValueError('Not a TextBox font')
+        self.data = data
+        self.height = data[4]
+        self.pages = (self.height + 7) // 8
+        self.count = data[6] | (data[7] << 8)
+        self._bitmaps = 8 + 5 * self.count
+        self._first = self._code(0)
+        self.max_width = 0
+        for i in range(self.count):
+            self.max_width = max(self.max_width, data[8 + 5 * i + 4])
+        self._glyphs = [None] * self.count # FrameBuffers by glyph index
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls(bytearray(f.read()))
+
+    def _code(self, i):
+        d = self.data
+        e = 8 + 5 * i
+        return d[e] | (d[e + 1] << 8)
+
+    # Index of char in the glyph table, 0 if it is missing
+    def index(self, char):
+        code = ord(char)
+        # Codes without gaps from the first one are found directly
+        i = code - self._first
+        if 0 <= i < self.count and self._code(i) == code:
+            return i
+        lo = 0
+        hi = self.count - 1
+        while lo <= hi:
+            i = (lo + hi) // 2
+            c = self._code(i)
+            if c == code:
+                return i
+            if c < code:
+                lo = i + 1
+            else:
+                hi = i - 1
+        return 0
+
+    def width(self, char):
+        return self.data[8 + 5 * self.index(char) + 4]
+
+    def text_width(self, txt):
+        w = 0
+        for char in txt:
+            w += self.width(char)
+        return w
+
+    def fit(self, txt, width):
+        n = 0
+        for char in txt:
+            width -= self.width(char)
+            if width < 0:
+                break
+            n += 1
+        return n
+
+    def draw(self, buffer, char, x, y, palette):
+        i = self.index(char)
+        glyph = self._glyphs[i]
+        if glyph is None:
+            glyph = self._glyphs[i] = self._glyph(i)
+        buffer.blit(glyph, x, y, -1, palette)
+
+    # FrameBuffer of glyph i on its bitmap
+    def _glyph(self, i):
+        d = self.data
+        e = 8 + 5 * i
+        w = d[e + 4]
+        start = self._bitmaps + (d[e + 2] | (d[e + 3] << 8))
+        bitmap = d[start : start + w * self.pages]
+        if not self._writable:
+            bitmap = bytearray(bitmap)
+        return FrameBuffer(bitmap, w, self.height, MONO_VLSB)
+
+
+def build(height, glyphs):
+    pages = (height + 7) // 8
+    table = bytearray()
+    bitmaps = bytearray()
+    for char in sorted(glyphs):
+        columns = glyphs[char]
+        code = ord(char)
+        table += bytes((code & 0xff, code >> 8, len(bitmaps) & 0xff, len(bitmaps) >> 8,
+                        len(columns)))
+        for page in range(pages):
+            for column in columns:
+                bitmaps.append((column >> (8 * page)) & 0xff)
+    count = len(glyphs)
+    return bytes(b'TBF1' + bytes((height, 0, count & 0xff, count >> 8)) + table + bitmaps)
@@ -0,0 +1,150 @@
+from TextBox import Batch
+
+"""
+Stacks several TextBoxes on one display.
+
+The Screen places the boxes below each other in the order they were
+added. If a box grows or shrinks (show() after add_line(), delete_line())
+the boxes below it are moved: the region below the changed box is
+cleared and the moved boxes are drawn again from their line buffers
+at their new position. Text is not rendered again.
+
+All boxes send their changes through the Screen. Inside
+screen.begin() / screen.commit() (or "with screen:") the changes of all
+boxes are collected and the display is refreshed once.
+
+    Initialization:
+
+        screen = Screen(display, pos = 0, gap = 5)
+
+        Parameters: display: Display object
+                    pos: Vertical position of the first box: int
+                    gap: Space between two boxes: int
+
+    Methods:
+
+        box = screen.add(box): Place box below the last box
+                               -> returns box
+
+        screen.remove(box): Clear box and move the boxes below up
+
+        screen.show(): Draw all boxes with one refresh
+
+        screen.begin() / screen.commit(): Collect the changes of all
+                               boxes and refresh the display once.
+                               update_line() only stores the text,
+                               lines are drawn on commit()
+
+    Example:
+
+        screen = Screen(display, pos = 5)
+        BOX_1 = screen.add(TextBoxTFT(display, caption = 'Box 1'))
+        BOX_2 = screen.add(TextBoxTFT(display, caption = 'Box 2'))
+        line_1 = BOX_1.add_line('A')
+        BOX_2.add_line('B')
+        screen.show()
+
+        BOX_1.add_line('C')
+        BOX_1.show() # BOX_2 is moved down
+
+        with screen:
+            BOX_1.update_line(line_1, 'D')
+            BOX_2.update_caption('E')
+"""
+class Screen(Batch):
+    def __init__(self, display, pos = 0, gap = 5):
+        super().__init__(display)
+        self.pos = pos
+        self.gap = gap
+        self.boxes = []
+
+    # Place box below the last box. Returns box
+    def add(self, box):
+        if box.screen is not None:
+            print('Error: add: Box is already on a screen.')
+            return box
+        if self.boxes:
+            last = self.boxes[-1]
+            pos = last.pos + last.height + self.gap
+        else:
+            pos = self.pos
+        if box.cap is None:
+            box.pos = pos
+        elif box.pos != pos:
+            box.set_pos(pos)
+        box.screen = self
+        self.boxes.append(box)
+        # Join a running begin() / commit()
+        for _ in range(self._batch):
+            box.begin()
+        return box
+
+    # Clear box and move the boxes below it up
+    def remove(self, box):
+        if box not in self.boxes:
+            print('Error: remove: Box is not on this screen.')
+            return False
+        self.begin()
+        index = self.boxes.index(box)
+        # Leave the running begin() / commit()
+        for _ in range(self._batch):
+            box.commit()
+        if box.cap is not None:
+            box.clear()
+        box.screen = None
+        self.boxes.pop(index)
+        self._layout(index)
+        self.commit()
+
+    # Draw all boxes with one refresh
+    def show(self):
+        self.begin()
+        for box in self.boxes:
+            box.show()
+        self.commit()
+
+    def begin(self):
+        super().begin()
+        for box in self.boxes:
+            box.begin()
+
+    # Draw pending lines of all boxes and refresh once
+    def commit(self):
+        for box in self.boxes:
+            box.commit()
+        super().commit()
+
+    # Called by a box whose height changed
+    def _relocate(self, box):
+        self._layout(self.boxes.index(box) + 1)
+
+    # Place the boxes from index on below the box before them.
+    # The region from the bottom of that box to the lowest old or new
+    # bottom of the moved boxes is cleared and the boxes are redrawn.
+    def _layout(self, index):
+        boxes = self.boxes
+        if index >= len(boxes):
+            return
+        if index > 0:
+            top = boxes[index - 1].pos + boxes[index - 1].height
+            pos = top + self.gap
+        else:
+            top = self.pos
+            pos = top
+        end = top
+        moved = False
+        for box in boxes[index:]:
+            end = max(end, box.pos + box.height)
+            if box.pos != pos:
+                box.pos = pos
+                moved = True
+            pos += box.height + self.gap
+        if not moved:
+            return
+        end = max(end, pos - self.gap)
+        width = self.display.width
+        self.display.fill_rect(0, top, width, end - top, 0) # black
+        for box in boxes[index:]:
+            if box.cap is not None:
+                box._draw()
+        self._flush(0, top, width, end - top)
@@ -0,0 +1,171 @@
+from TextBox import TextBox, TextBoxTFT, TextBoxOLED
+
+"""
+Scrolling TextBox holding any number of lines
+
+Only rows lines are visible. The other lines are kept as text and
+drawn when they are scrolled into view. Scrolling moves the line
+buffers of the visible rows and renders only the rows that become
+visible.
+
+Use ScrollBoxTFT / ScrollBoxOLED:
+
+    from TextBoxScroll import ScrollBoxTFT, ScrollBoxOLED
+    
+    MyBox = ScrollBoxTFT(display, caption = '', pos = 0, rows = 5,
+                         fg_color = (255, 255, 255), bg_color = (0, 0, 0))
+    
+    MyBox = ScrollBoxOLED(display, caption = '', pos = 0, rows = 4,
+                          page_aligned = False)
+    
+    rows: number of visible lines: int
+          None: as many as fit below pos
+    
+Line-ids are the index of the line in MyBox.items (0, 1, 2...).
+add_line(), update_line(), invert_color() and delete_line() work on
+all lines, visible or not.
+
+    MyBox.scroll(n): Scroll n lines down (n > 0) or up (n < 0)
+    MyBox.scroll_to(index): Make line index the top visible line
+    MyBox.top: Index of the top visible line
+"""
+class ScrollBox:
+    def _init_rows(self, rows):
+        if rows is None:
+            rows = ((self.display_height - self.pos - self.content_skip - self.border)
+                    // self.line_height)
+        self.items = []        # Text of all lines
+        self._inverted = set() # Indexes of inverted lines
+        self.top = 0
+        self.rows = 0
+        for _ in range(rows):
+            if TextBox.add_line(self, '') is None:
+                break
+            self.rows += 1
+    
+    # Append a line. Returns its index
+    def add_line(self, content, before = None):
+        if before is not None:
+            print('Error: add_line: before is not supported by ScrollBox.')
+            return None
+        self.items.append(self._trim_maxlen(str(content)))
+        index = len(self.items) - 1
+        self._show_item(index)
+        return index
+    
+    def add_field_line(self, template, before = None):
+        print('Error: add_field_line: Not supported by ScrollBox.')
+        return None
+    
+    def update_number(self, index, value, width = 6, decimals = 0, scaled = False):
+        print('Error: update_number: Not supported by ScrollBox.')
+        return False
+    
+    def update_line(self, index, content):
+        if not 0 <= index < len(self.items):
+            print('Error: update_line: Wrong line index.')
+            return False
+        self.items[index] = self._trim_maxlen(str(content))
+        self._show_item(index)
+    
+    def invert_color(self, index):
+        if not 0 <= index < len(self.items):
+            print('Error: invert: Wrong line index.')
+            return False
+        if index in self._inverted:
+            self._inverted.remove(index)
+        else:
+            self._inverted.add(index)
+        self._show_item(index)
+    
+    # Delete a line. The lines below move up and their indexes
+    # decrease by one
+    def delete_line(self, index):
+        if not 0 <= index < len(self.items):
+            print('Error: delete_line: Wrong line index.')
+            return False
+        self.items.pop(index)
+        self._inverted = set(i - 1 if i > index else i
+                             for i in self._inverted if i != index)
+        self.begin()
+        if self.top > 0 and self.top + self.rows > len(self.items):
+            # Keep the last row filled
+            self.scroll(-1)
+        for i in range(max(index, self.top), self.top + self.rows):
+            self._show_item(i)
+        self.commit()
+    
+    def scroll(self, n):
+        self.scroll_to(self.top + n)
+    
+    # Make line index the top visible line
+    def scroll_to(self, index):
+        top = max(0, min(index, len(self.items) - self.rows))
+        delta = top - self.top
+        if delta == 0:
+            return
+        self.top = top
+        lines = self.lines
+        if abs(delta) >= self.rows:
+            # Nothing to reuse
+            for i in range(top, top + self.rows):
+                self._render_row(self._row(i - top), i)
+        elif delta > 0:
+            # Move the top rows to the bottom and render them
+            for i in range(top + self.rows - delta, top + self.rows):
+                row = lines.first
+                lines.remove(row)
+                lines.insert(row)
+                self._render_row(row, i)
+        else:
+            # Move the bottom rows to the top and render them
+            for i in range(top - delta - 1, top - 1, -1):
+                row = lines.last
+                lines.remove(row)
+                lines.insert(row, lines.first)
+                self._render_row(row, i)
+        if self.cap is not None:
+            # Blit all rows at their new position
+            self._draw_lines(lines.first, 0)
+            self._flush(self.border, self.pos + self.content_skip,
+                        self.display_width - 2 * self.border, self.line_height * self.rows)
+    
+    # Line object of visible row number
+    def _row(self, number):
+        row = self.lines.first
+        for _ in range(number):
+            row = row.next
+        return row
+    
+    # Draw the text of line index into a row with the colors of the line
+    # Returns True if the row changed
+    def _render_row(self, row, index):
+        if index in self._inverted:
+            row.fg_color, row.bg_color = self.bg_color, self.fg_color
+        else:
+            row.fg_color, row.bg_color = self.fg_color, self.bg_color
+        return row.set_text_line(self.items[index] if index < len(self.items) else '')
+    
+    # Draw line index if it is visible
+    def _show_item(self, index):
+        number = index - self.top
+        if 0 <= number < self.rows:
+            row = self._row(number)
+            if self._render_row(row, index) and self.cap is not None:
+                row.show_line(self.display, self._abs_pos(row))
+                self._flush_line(row)
+
+
+class ScrollBoxTFT(ScrollBox, TextBoxTFT):
+    def __init__(self, display, caption = '', pos = 0, rows = None,
+                 fg_color = ((255,) * 3), bg_color = ((0,) * 3), low_memory = False):
+        TextBoxTFT.__init__(self, display, caption, pos, fg_color, bg_color, low_memory)
+        self._init_rows(rows)
+
+
+class ScrollBoxOLED(ScrollBox, TextBoxOLED):
+    def __init__(self, display, caption = '', pos = 0, rows = None, low_memory = False,
+                 page_aligned = False):
+        TextBoxOLED.__init__(self, display, caption, pos, low_memory,
+                             page_aligned = page_aligned)
+        self._init_rows(rows)
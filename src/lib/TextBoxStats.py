@@ -0,0 +1,158 @@
+from time import ticks_us, ticks_diff
+from TextBox import TextBox
+
+"""
+Counts and times the work of a TextBox or a display driver.
+
+Nothing is measured unless instrument() is called for an object. It
+replaces methods of that one object (and of its lines) with wrappers
+which count and time the calls, the classes are not changed. Boxes and
+displays which are not instrumented run the same code as without this
+module, so it can be left in production firmware.
+
+    Usage:
+
+        instrument(box)
+        instrument(display)
+
+        box.stats(reset = False): -> dict
+            'renders', 'render_us':  Line.set_text_line(), set_number()
+                                     and set_field() calls and time
+            'blits', 'blit_us':      Line.show_line() and show_field()
+                                     calls and time
+            'allocs', 'alloc_bytes': FrameBuffers created for lines and
+                                     glyph tiles
+
+        display.stats(reset = False): -> dict
+            'flushes', 'flush_us':   show_rect() (show() if the driver
+                                     has no show_rect()) calls and time
+            'bytes', 'transactions': Bytes and write calls on the bus
+
+        reset = True: Set the counters to 0 after reading them.
+
+    Times are in microseconds and include the wrapper. Lines created
+    before instrument() are counted from then on.
+
+    Example:
+
+        instrument(BOX_1)
+        instrument(display)
+        BOX_1.update_line(line_1, 'A')
+        print(BOX_1.stats(), display.stats(reset = True))
+"""
+def instrument(obj):
+    if hasattr(obj, 'stats'):
+        return
+    counters = {}
+    if isinstance(obj, TextBox):
+        _instrument_box(obj, counters)
+    else:
+        _instrument_display(obj, counters)
+
+    def stats(reset = False):
+        result = dict(counters)
+        if reset:
+            for key in counters:
+                counters[key] = 0
+        return result
+
+    obj.stats = stats
+
+
+# Methods of Line objects wrapped by instrument()
+_RENDER = ('set_text_line', 'set_number', 'set_field')
+_BLIT = ('show_line', 'show_field')
+
+
+def _instrument_box(box, counters):
+    for key in ('renders', 'render_us', 'blits', 'blit_us', 'allocs', 'alloc_bytes'):
+        counters[key] = 0
+
+    # Lines created from now on wrap their methods before drawing
+    box.Line = _line_class(box.Line, counters)
+    box.FieldLine = _line_class(box.FieldLine, counters)
+    lines = list(box.lines)
+    # Caption and the render line of a Console
+    for line in (box.cap, getattr(box, '_row', None)):
+        if line is not None:
+            lines.append(line)
+    for line in lines:
+        _instrument_line(line, counters)
+
+    buffer = box.buffer
+
+    def counted_buffer(width, height):
+        counters['allocs'] += 1
+        counters['alloc_bytes'] += box.buffer_size(width, height)
+        return buffer(width, height)
+
+    box.buffer = counted_buffer
+
+
+def _line_class(base, counters):
+    class Line(base):
+        def __init__(self, *args):
+            _instrument_line(self, counters)
+            base.__init__(self, *args)
+
+    return Line
+
+
+def _instrument_line(line, counters):
+    for name in _RENDER:
+        if hasattr(line, name):
+            setattr(line, name, _timed(getattr(line, name), counters, 'renders', 'render_us'))
+    for name in _BLIT:
+        if hasattr(line, name):
+            setattr(line, name, _timed(getattr(line, name), counters, 'blits', 'blit_us'))
+
+
+def _instrument_display(display, counters):
+    for key in ('flushes', 'flush_us', 'bytes', 'transactions'):
+        counters[key] = 0
+    # show() of the included drivers calls show_rect(), count only one
+    name = 'show_rect' if hasattr(display, 'show_rect') else 'show'
+    setattr(display, name, _timed(getattr(display, name), counters, 'flushes', 'flush_us'))
+    # Bus of the SSD1306 I2C / SPI and the ST7735R drivers
+    for name in ('i2c', 'spi', '_spi', '_writer'):
+        bus = getattr(display, name, None)
+        if bus is not None:
+            setattr(display, name, _Bus(bus, counters))
+
+
+def _timed(func, counters, calls, us):
+    def timed(*args):
+        t0 = ticks_us()
+        result = func(*args)
+        counters[us] += ticks_diff(ticks_us(), t0)
+        counters[calls] += 1
+        return result
+
+    return timed
+
+
+# Counts the writes to a bus (machine.I2C, machine.SPI or the writer
+# of the ST7735R) and passes all calls on
+class _Bus:
+    def __init__(self, bus, counters):
+        self._bus = bus
+        self._counters = counters
+
+    def write(self, buf):
+        self._counters['transactions'] += 1
+        self._counters['bytes'] += len(buf)
+        return self._bus.write(buf)
+
+    def writeto(self, addr, buf, *args):
+        self._counters['transactions'] += 1
+        self._counters['bytes'] += len(buf)
+        return self._bus.writeto(addr, buf, *args)
+
+    def writevto(self, addr, vector, *args):
+        self._counters['transactions'] += 1
+        for buf in vector:
+            self._counters['bytes'] += len(buf)
+        return self._bus.writevto(addr, vector, *args)
+
+    def __getattr__(self, name):
+        return getattr(self._bus, name)
@@ -2,6 +2,7 @@
  
 from micropython import const
 import framebuf
+import micropython
  
 # register definitions
 SET_CONTRAST = const(0x81)
@@ -22,20 +23,52 @@ SET_PRECHARGE = const(0xD9)
 SET_VCOM_DESEL = const(0xDB)
 SET_CHARGE_PUMP = const(0x8D)
  
+ 
+# Index of the first byte in start .. end - 1 that differs between a and b,
+# end if there is none
+@micropython.viper
+def _first_diff(a: ptr8, b: ptr8, start: int, end: int) -> int:
+    i = start
+    while i < end:
+        if a[i] != b[i]:
+            return i
+        i += 1
+    return end
+ 
+ 
+# Index of the last byte in start .. end - 1 that differs between a and b,
+# start - 1 if there is none
+@micropython.viper
+def _last_diff(a: ptr8, b: ptr8, start: int, end: int) -> int:
+    i = end - 1
+    while i >= start:
+        if a[i] != b[i]:
+            return i
+        i -= 1
+    return start - 1
+ 
 # Subclassing FrameBuffer provides support for graphics primitives
 # http://docs.micropython.org/en/latest/pyboard/library/framebuf.html
+# shadow=True keeps a copy of the buffer as last sent (1 byte per column
+# and page). show() and show_rect() then only send the changed columns
+# of each page
 class SSD1306(framebuf.FrameBuffer):
-    def __init__(self, width, height, external_vcc):
+    def __init__(self, width, height, external_vcc, shadow=False):
         self.width = width
         self.height = height
         self.external_vcc = external_vcc
         self.pages = self.height // 8
         self.buffer = bytearray(self.pages * self.width)
+        self._mvb = memoryview(self.buffer)
+        self._winbuf = bytearray(6)  # Column and page address commands
+        self._shadow = bytearray(len(self.buffer)) if shadow else None
+        self._resync = True  # Display content unknown, send without comparing
         super().__init__(self.buffer, self.width, self.height, framebuf.MONO_VLSB)
         self.init_display()
  
+    # The commands are sent in one transaction
     def init_display(self):
-        for cmd in (
+        self.write_cmds(bytes((
             SET_DISP | 0x00,  # off
             # address setting
             SET_MEM_ADDR,
@@ -65,12 +98,18 @@ class SSD1306(framebuf.FrameBuffer):
             # charge pump
             SET_CHARGE_PUMP,
             0x10 if self.external_vcc else 0x14,
-            SET_DISP | 0x01,
-        ):  # on
-            self.write_cmd(cmd)
+            SET_DISP | 0x01,  # on
+        )))
         self.fill(0)
+        self._resync = True
         self.show()
  
+    # Hardware vertical scrolling. The SSD1306 can only scroll the whole
+    # display (y = 0, h = height): row offset is shown at the top and the
+    # rows wrap around. The framebuffer is not changed
+    def vscroll(self, offset, y=0, h=None):
+        self.write_cmd(SET_DISP_START_LINE | (offset % self.height))
+ 
     def poweroff(self):
         self.write_cmd(SET_DISP | 0x00)
  
@@ -85,41 +124,85 @@ class SSD1306(framebuf.FrameBuffer):
         self.write_cmd(SET_NORM_INV | (invert & 1))
  
     def show(self):
-        x0 = 0
-        x1 = self.width - 1
-        if self.width == 64:
-            # displays with width of 64 pixels are shifted by 32
-            x0 += 32
-            x1 += 32
-        self.write_cmd(SET_COL_ADDR)
-        self.write_cmd(x0)
-        self.write_cmd(x1)
-        self.write_cmd(SET_PAGE_ADDR)
-        self.write_cmd(0)
-        self.write_cmd(self.pages - 1)
-        self.write_data(self.buffer)
+        self.show_rect(0, 0, self.width, self.height)
+ 
+    # Send only the pages (8 pixel rows) and columns overlapping
+    # the rectangle x, y, w, h
+    def show_rect(self, x, y, w, h):
+        x0 = max(x, 0)
+        x1 = min(x + w, self.width) - 1
+        p0 = max(y, 0) // 8
+        p1 = (min(y + h, self.height) - 1) // 8
+        if x1 < x0 or p1 < p0:
+            return
+        width = self.width
+        shadow = self._shadow
+        if shadow is not None and not self._resync:
+            # Send the changed span of each page
+            buf = self.buffer
+            for page in range(p0 * width, (p1 + 1) * width, width):
+                first = _first_diff(buf, shadow, page + x0, page + x1 + 1)
+                if first <= page + x1:
+                    last = _last_diff(buf, shadow, first, page + x1 + 1)
+                    p = page // width
+                    self._set_window(first - page, last - page, p, p)
+                    self.write_data(self._mvb[first : last + 1])
+                    shadow[first : last + 1] = self._mvb[first : last + 1]
+            return
+        self._set_window(x0, x1, p0, p1)
+        if x0 == 0 and x1 == width - 1:
+            # Full rows are contiguous in the buffer
+            self.write_data(self._mvb[p0 * width : (p1 + 1) * width])
+        else:
+            # The column window wraps to the next page by itself
+            for page in range(p0 * width, (p1 + 1) * width, width):
+                self.write_data(self._mvb[page + x0 : page + x1 + 1])
+        if shadow is not None:
+            for page in range(p0 * width, (p1 + 1) * width, width):
+                shadow[page + x0 : page + x1 + 1] = self._mvb[page + x0 : page + x1 + 1]
+            if x0 == 0 and x1 == width - 1 and p0 == 0 and p1 == self.pages - 1:
+                self._resync = False
+ 
+    # Set the column and page window for the following data
+    def _set_window(self, x0, x1, p0, p1):
+        # displays with width of 64 pixels are shifted by 32
+        offset = 32 if self.width == 64 else 0
+        wb = self._winbuf
+        wb[0] = SET_COL_ADDR
+        wb[1] = x0 + offset
+        wb[2] = x1 + offset
+        wb[3] = SET_PAGE_ADDR
+        wb[4] = p0
+        wb[5] = p1
+        self.write_cmds(wb)
  
  
 class SSD1306_I2C(SSD1306):
-    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False):
+    def __init__(self, width, height, i2c, addr=0x3C, external_vcc=False, shadow=False):
         self.i2c = i2c
         self.addr = addr
         self.temp = bytearray(2)
         self.write_list = [b"\x40", None]  # Co=0, D/C#=1
-        super().__init__(width, height, external_vcc)
+        self.cmd_list = [b"\x00", None]  # Co=0, D/C#=0
+        super().__init__(width, height, external_vcc, shadow)
  
     def write_cmd(self, cmd):
         self.temp[0] = 0x80  # Co=1, D/C#=0
         self.temp[1] = cmd
         self.i2c.writeto(self.addr, self.temp)
  
+    # Several commands in one transaction
+    def write_cmds(self, buf):
+        self.cmd_list[1] = buf
+        self.i2c.writevto(self.addr, self.cmd_list)
+ 
     def write_data(self, buf):
         self.write_list[1] = buf
         self.i2c.writevto(self.addr, self.write_list)
  
  
 class SSD1306_SPI(SSD1306):
-    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False):
+    def __init__(self, width, height, spi, dc, res, cs, external_vcc=False, shadow=False):
         self.rate = 10 * 1024 * 1024
         dc.init(dc.OUT, value=0)
         res.init(res.OUT, value=0)
@@ -135,7 +218,7 @@ class SSD1306_SPI(SSD1306):
         self.res(0)
         time.sleep_ms(10)
         self.res(1)
-        super().__init__(width, height, external_vcc)
+        super().__init__(width, height, external_vcc, shadow)
  
     def write_cmd(self, cmd):
         self.spi.init(baudrate=self.rate, polarity=0, phase=0)
@@ -145,6 +228,15 @@ class SSD1306_SPI(SSD1306):
         self.spi.write(bytearray([cmd]))
         self.cs(1)
  
+    # Several commands in one burst
+    def write_cmds(self, buf):
+        self.spi.init(baudrate=self.rate, polarity=0, phase=0)
+        self.cs(1)
+        self.dc(0)
+        self.cs(0)
+        self.spi.write(buf)
+        self.cs(1)
+ 
     def write_data(self, buf):
         self.spi.init(baudrate=self.rate, polarity=0, phase=0)
         self.cs(1)
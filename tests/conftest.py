@@ -0,0 +1,9 @@
+# The tests run the modules of src/lib on the simulation (see /sim):
+#
+#     python -m pytest -q tests
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sim
+sim.install()
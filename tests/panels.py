@@ -0,0 +1,159 @@
+"""
+Panel emulators for the tests.
+
+They listen to a fake bus of /sim and decode the commands and data sent
+to it into the RAM of the panel, so a test can check that the pixels
+which reached the panel are the pixels of the driver's FrameBuffer:
+
+    ram = OledRam(i2c)          SSD1306 on I2C
+    ram = OledRam(spi, dc)      SSD1306 on SPI, dc: data / command Pin
+    ram = TftRam(spi, dc)       ST7735R
+
+    ram.matches(display) -> number of pixels which differ (0: all sent)
+
+Only the commands the drivers use to address the RAM are decoded.
+"""
+
+# SSD1306 commands followed by arguments, number of arguments
+_OLED_ARGS = {0x20: 1, 0x21: 2, 0x22: 2, 0x81: 1, 0x8D: 1, 0xA8: 1,
+              0xD3: 1, 0xD5: 1, 0xD9: 1, 0xDA: 1, 0xDB: 1}
+
+
+class OledRam:
+    def __init__(self, bus, dc = None, width = 128, pages = 8):
+        self.width = width
+        self.pages = pages
+        self.ram = bytearray(width * pages)
+        self._dc = dc
+        self._cmd = None  # Command waiting for arguments
+        self._args = []
+        self._window(0, width - 1, 0, pages - 1)
+        bus.listeners.append(self._receive)
+
+    def _window(self, c0, c1, p0, p1):
+        self.c0, self.c1, self.p0, self.p1 = c0, c1, p0, p1
+        self.col = c0
+        self.page = p0
+
+    def _receive(self, bus, op, data):
+        if self._dc is not None:
+            if self._dc():
+                self._data(data)
+            else:
+                self._commands(data)
+        # I2C: control byte 0x80 (one command), 0x00 (commands), 0x40 (data)
+        elif data[0] == 0x40:
+            self._data(data[1:])
+        else:
+            self._commands(data[1:])
+
+    def _commands(self, data):
+        for b in data:
+            if self._cmd is None:
+                if b in _OLED_ARGS:
+                    self._cmd = b
+                    self._args = []
+                continue
+            self._args.append(b)
+            if len(self._args) == _OLED_ARGS[self._cmd]:
+                if self._cmd == 0x21:
+                    self._window(self._args[0], self._args[1], self.p0, self.p1)
+                elif self._cmd == 0x22:
+                    self._window(self.c0, self.c1, self._args[0], self._args[1])
+                self._cmd = None
+
+    def _data(self, data):
+        for b in data:
+            self.ram[self.page * self.width + self.col] = b
+            self.col += 1
+            if self.col > self.c1:
+                self.col = self.c0
+                self.page += 1
+                if self.page > self.p1:
+                    self.page = self.p0
+
+    # Number of bytes (columns of 8 pixels) which differ from the display
+    def matches(self, display):
+        return sum(1 for a, b in zip(self.ram, display.buffer) if a != b)
+
+
+class TftRam:
+    def __init__(self, bus, dc, width = 128, height = 160):
+        self.width = width
+        self.height = height
+        self.ram = [[0] * width for _ in range(height)]
+        self._dc = dc
+        self._cmd = None
+        self._args = bytearray()
+        self._pixels = bytearray()  # Bytes of an incomplete pixel
+        self.bits = 12
+        self.c0, self.c1, self.r0, self.r1 = 0, width - 1, 0, height - 1
+        self.x = self.y = 0
+        bus.listeners.append(self._receive)
+
+    def _receive(self, bus, op, data):
+        if not self._dc():
+            self._cmd = data[0]
+            self._args = bytearray()
+            self._pixels = bytearray()
+            if self._cmd == 0x2C:  # RAMWR
+                self.x = self.c0
+                self.y = self.r0
+            return
+        if self._cmd == 0x2C:
+            self._write(data)
+            return
+        self._args += data
+        a = self._args
+        if self._cmd == 0x2A and len(a) == 4:  # CASET
+            self.c0, self.c1 = (a[0] << 8) | a[1], (a[2] << 8) | a[3]
+        elif self._cmd == 0x2B and len(a) == 4:  # RASET
+            self.r0, self.r1 = (a[0] << 8) | a[1], (a[2] << 8) | a[3]
+        elif self._cmd == 0x3A:  # COLMOD
+            self.bits = 12 if a[0] == 3 else 16
+
+    def _write(self, data):
+        p = self._pixels
+        p += data
+        i = 0
+        if self.bits == 12:
+            # 2 pixels in 3 bytes
+            while i + 3 <= len(p):
+                self._put((p[i] << 4) | (p[i + 1] >> 4))
+                self._put(((p[i + 1] & 0x0F) << 8) | p[i + 2])
+                i += 3
+        else:
+            while i + 2 <= len(p):
+                self._put((p[i] << 8) | p[i + 1])
+                i += 2
+        del p[:i]
+
+    def _put(self, value):
+        if self.y < self.height and self.x < self.width:
+            self.ram[self.y][self.x] = value
+        self.x += 1
+        if self.x > self.c1:
+            self.x = self.c0
+            self.y += 1
+            if self.y > self.r1:
+                self.y = self.r0
+
+    # Number of pixels which differ from the display
+    def matches(self, display):
+        bad = 0
+        for y in range(display.height):
+            # The panel keeps row y of the FrameBuffer in RAM row height - 1 - y
+            row = self.ram[display.height - 1 - y]
+            for x in range(display.width):
+                if row[x] != _panel_color(display.pixel(x, y), self.bits):
+                    bad += 1
+        return bad
+
+
+# Color of a FrameBuffer pixel as received by the panel
+def _panel_color(c, bits):
+    if bits == 12:
+        # rrrgggbb to RGB444, as _lcopy of the ST7735R driver
+        return ((c & 0xE0) << 4) | ((c & 0x1C) << 3) | ((c & 3) << 2)
+    # RGB565 is stored byte swapped
+    return ((c & 0xFF) << 8) | (c >> 8)
@@ -0,0 +1,199 @@
+"""
+Regression tests for the incremental drawing paths.
+
+Each test changes a box step by step (update, delete / insert, scroll,
+moving boxes on a Screen, ...) and compares the result with a box that
+was created with the final contents and drawn once with show(). The
+panel RAM rebuilt from the bus traffic (see panels.py) must match the
+FrameBuffer of the driver, so nothing drawn was left unsent.
+"""
+import pytest
+
+from machine import I2C, SPI, Pin
+import ssd1306
+from ST7735R import ST7735R
+from TextBox import TextBoxTFT, TextBoxOLED
+from TextBoxScreen import Screen
+from TextBoxScroll import ScrollBoxTFT, ScrollBoxOLED
+from TextBoxFont import Font, build
+from panels import OledRam, TftRam
+
+# Displays: (name, OLED, options of the display, options of the box)
+DISPLAYS = [
+    ('oled', True, {}, {}),
+    ('oled-spi', True, {'spi': True}, {}),
+    ('oled-paged', True, {}, {'page_aligned': True}),
+    ('oled-shadow', True, {'shadow': True}, {}),
+    ('tft', False, {}, {}),
+    ('tft-565', False, {'rgb565': True}, {}),
+    ('tft-shadow', False, {'shadow': True}, {}),
+]
+
+
+def display(oled, spi = False, **options):
+    if oled and spi:
+        bus, dc = SPI(1), Pin(4)
+        ram = OledRam(bus, dc)
+        return ssd1306.SSD1306_SPI(128, 64, bus, dc, Pin(5), Pin(6), **options), ram
+    if oled:
+        bus = I2C(0)
+        ram = OledRam(bus)
+        return ssd1306.SSD1306_I2C(128, 64, bus, **options), ram
+    bus, dc = SPI(0), Pin(2)
+    ram = TftRam(bus, dc)
+    return ST7735R(bus, Pin(1), dc, Pin(3), **options), ram
+
+
+def box(disp, oled, caption, low_memory = False, **options):
+    if oled:
+        return TextBoxOLED(disp, caption, low_memory = low_memory, **options)
+    return TextBoxTFT(disp, caption, low_memory = low_memory, **options)
+
+
+def pixels(disp):
+    return [disp.pixel(x, y) for y in range(disp.height) for x in range(disp.width)]
+
+
+# The display shows the same as ref and the panel got all of it
+def check(disp, ram, ref):
+    assert pixels(disp) == pixels(ref)
+    assert ram.matches(disp) == 0
+
+
+@pytest.fixture(params = DISPLAYS, ids = [d[0] for d in DISPLAYS])
+def kind(request):
+    return request.param
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_update_delete_insert(kind, low_memory):
+    _, oled, disp_opt, box_opt = kind
+    disp, ram = display(oled, **disp_opt)
+    b = box(disp, oled, 'Caption', low_memory, **box_opt)
+    lines = [b.add_line(txt) for txt in ('One', 'Two', 'Three')]
+    b.show()
+    b.update_line(lines[0], 'Uno')
+    b.update_caption('Cap 2')
+    b.delete_line(lines[1])
+    b.add_line('Four', before = lines[2])
+    b.show()
+    b.invert_color(lines[2])
+    b.update_line(lines[2], 'Tres')
+    with b:
+        b.update_line(lines[0], 'Eins ' + '-' * 20)
+        b.update_line(lines[2], 'Drei')
+
+    ref, _ = display(oled, **disp_opt)
+    r = box(ref, oled, 'Cap 2', low_memory, **box_opt)
+    last = r.add_lines(('Eins ' + '-' * 20, 'Four', 'Drei'))[-1]
+    r.show()
+    r.invert_color(last)
+    check(disp, ram, ref)
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_fields_and_numbers(kind, low_memory):
+    _, oled, disp_opt, box_opt = kind
+    disp, ram = display(oled, **disp_opt)
+    b = box(disp, oled, 'Values', low_memory, **box_opt)
+    field = b.add_field_line('T:{t:5} C {s:<3}')
+    number = b.add_line('')
+    b.show()
+    b.update_field(field, 't', 123.4)
+    b.update_field(field, 's', 'okay')
+    b.update_field(field, 't', 23.4)
+    b.update_number(number, 123456, width = 5)
+    b.update_number(number, -2.25, width = 5, decimals = 1)
+    b.update_number(number, float('nan'), width = 4)
+    b.update_number(number, 125, width = 6, decimals = 2, scaled = True)
+
+    ref, _ = display(oled, **disp_opt)
+    r = box(ref, oled, 'Values', low_memory, **box_opt)
+    r.add_lines(('T: 23.4 C oka', '  1.25'))
+    r.show()
+    check(disp, ram, ref)
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_screen_relocation(kind, low_memory):
+    _, oled, disp_opt, box_opt = kind
+    disp, ram = display(oled, **disp_opt)
+    screen = Screen(disp, gap = 2)
+    b1 = screen.add(box(disp, oled, 'A', low_memory, **box_opt))
+    b2 = screen.add(box(disp, oled, 'B', low_memory, **box_opt))
+    b3 = screen.add(box(disp, oled, 'C', low_memory, **box_opt))
+    b1.add_line('a1')
+    b2_line = b2.add_line('b1')
+    b3.add_line('c1')
+    screen.show()
+    a2 = b1.add_line('a2')
+    b1.show() # Moves B and C down
+    b2.update_line(b2_line, 'b2')
+    b1.delete_line(a2) # Moves B and C up
+    screen.remove(b2) # Moves C up
+
+    ref, _ = display(oled, **disp_opt)
+    ref_screen = Screen(ref, gap = 2)
+    r1 = ref_screen.add(box(ref, oled, 'A', low_memory, **box_opt))
+    r3 = ref_screen.add(box(ref, oled, 'C', low_memory, **box_opt))
+    r1.add_line('a1')
+    r3.add_line('c1')
+    ref_screen.show()
+    assert b3.pos == r3.pos
+    check(disp, ram, ref)
+
+
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_scroll(kind, low_memory):
+    _, oled, disp_opt, box_opt = kind
+    disp, ram = display(oled, **disp_opt)
+    if oled:
+        b = ScrollBoxOLED(disp, 'Scroll', rows = 3, low_memory = low_memory, **box_opt)
+    else:
+        b = ScrollBoxTFT(disp, 'Scroll', rows = 3, low_memory = low_memory)
+    for i in range(12):
+        b.add_line('Item %d' % i)
+    b.show()
+    b.invert_color(5)
+    for n in (1, 3, -2, 100, -10, 4, 2):
+        b.scroll(n)
+        b.update_line(b.top + 1, 'Row %d' % b.top)
+    b.update_line(0, 'Hidden')
+    assert b.top == 6
+
+    ref, _ = display(oled, **disp_opt)
+    r = box(ref, oled, 'Scroll', low_memory, **box_opt)
+    lines = r.add_lines(b.items[6:9])
+    r.show()
+    assert b.items[7] == 'Row 6'
+    check(disp, ram, ref)
+    # Line 5 is inverted when it scrolls back into view
+    b.scroll(-1)
+    for line, txt in zip(lines, b.items[5:8]):
+        r.update_line(line, txt)
+    r.invert_color(lines[0])
+    check(disp, ram, ref)
+
+
+# Text of a font is trimmed to the line without its padding, so it
+# never covers the border
+@pytest.mark.parametrize('low_memory', [False, True])
+def test_font_trim_keeps_border(low_memory):
+    glyphs = {chr(c): [0x3FF] * 4 for c in range(32, 127)}
+    font = Font(build(10, glyphs))
+    disp, ram = display(False)
+    b = TextBoxTFT(disp, 'Font', low_memory = low_memory, font = font)
+    line = b.add_line('Y' * 40)
+    b.show()
+    b.update_line(line, 'X' * 40)
+
+    ref, _ = display(False)
+    r = TextBoxTFT(ref, 'Font', low_memory = low_memory, font = font)
+    r.add_line('')
+    r.show()
+    assert ram.matches(disp) == 0
+    right = b.display_width - b.border - b.line_padding
+    y0 = b._abs_pos(b.lines.get(line))
+    for y in range(y0, y0 + b.line_height):
+        for x in range(right, b.display_width):
+            assert disp.pixel(x, y) == ref.pixel(x, y)
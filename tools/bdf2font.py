@@ -0,0 +1,100 @@
+"""
+Convert a BDF bitmap font into a TextBox font atlas (see src/lib/TextBoxFont.py).
+
+Usage (on a PC):
+
+    python tools/bdf2font.py font.bdf font.tbf
+    python tools/bdf2font.py font.bdf font.tbf --chars " -~äöüÄÖÜß°€"
+
+Copy font.tbf to the board and load it with Font.load('font.tbf').
+The glyphs are placed on the font's bounding box, so characters keep
+their baseline. The advance width (DWIDTH) of a glyph is its width in
+the atlas.
+"""
+import argparse
+import os
+import sys
+
+# TextBoxFont imports framebuf, which the simulation provides on a PC
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sim
+sim.install()
+from TextBoxFont import build
+
+
+def read_bdf(path):
+    glyphs = {}
+    with open(path) as f:
+        lines = iter(f.read().splitlines())
+    for line in lines:
+        if line.startswith('FONTBOUNDINGBOX'):
+            _, fw, fh, fx, fy = line.split()
+            height = int(fh)
+            base = int(fh) + int(fy)  # Rows from the top to the baseline
+        elif line.startswith('STARTCHAR'):
+            code = None
+            advance = 0
+            for line in lines:
+                key = line.split()[0] if line else ''
+                if key == 'ENCODING':
+                    code = int(line.split()[1])
+                elif key == 'DWIDTH':
+                    advance = int(line.split()[1])
+                elif key == 'BBX':
+                    bw, bh, bx, by = (int(v) for v in line.split()[1:])
+                elif key == 'BITMAP':
+                    rows = []
+                    for line in lines:
+                        if line == 'ENDCHAR':
+                            break
+                        rows.append(int(line, 16))
+                    break
+            if code is None or code < 0 or code > 0xffff:
+                continue
+            nbits = ((bw + 7) // 8) * 8
+            columns = [0] * max(advance, 1)
+            top = base - by - bh
+            for r, bits in enumerate(rows):
+                y = top + r
+                if not 0 <= y < height:
+                    continue
+                for c in range(bw):
+                    x = bx + c
+                    if bits & (1 << (nbits - 1 - c)) and 0 <= x < len(columns):
+                        columns[x] |= 1 << y
+            glyphs[chr(code)] = columns
+    return height, glyphs
+
+
+def char_range(spec):
+    chars = set()
+    i = 0
+    while i < len(spec):
+        if i + 2 < len(spec) and spec[i + 1] == '-':
+            chars.update(chr(c) for c in range(ord(spec[i]), ord(spec[i + 2]) + 1))
+            i += 3
+        else:
+            chars.add(spec[i])
+            i += 1
+    return chars
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Convert a BDF font into a TextBox font atlas')
+    parser.add_argument('bdf')
+    parser.add_argument('out')
+    parser.add_argument('--chars', default = ' -~', help = 'characters to include, a-b for ranges')
+    args = parser.parse_args()
+    height, glyphs = read_bdf(args.bdf)
+    wanted = char_range(args.chars)
+    glyphs = {c: cols for c, cols in glyphs.items() if c in wanted}
+    if not glyphs:
+        sys.exit('No glyphs found')
+    data = build(height, glyphs)
+    with open(args.out, 'wb') as f:
+        f.write(data)
+    print('{} glyphs, height {}, {} bytes'.format(len(glyphs), height, len(data)))
+
+
+if __name__ == '__main__':
+    main()